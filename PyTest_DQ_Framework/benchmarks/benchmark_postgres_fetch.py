@@ -0,0 +1,79 @@
+"""
+Benchmark of the result transfer paths of the DQ Postgres connector.
+
+Compares the former RealDictCursor + fetchall path with the 'chunked' and 'copy' fetch modes of
+PostgresConnectorContextManager on a generated result of --rows rows (no table is needed).
+
+Run from PyTest_DQ_Framework:
+    python -m benchmarks.benchmark_postgres_fetch --db_user myuser --db_password mypassword --rows 200000
+"""
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+from psycopg2.extras import RealDictCursor
+
+from src.connectors.postgres.postgres_connector import PostgresConnectorContextManager
+
+BENCHMARK_QUERY = """
+SELECT i AS id,
+       'Facility ' || (i % 50) AS facility_name,
+       DATE '2020-01-01' + (i % 1500) AS visit_date,
+       ROUND((random() * 500)::numeric, 2) AS treatment_cost,
+       (i % 240)::int AS duration_minutes
+FROM generate_series(1, {rows}) AS i
+"""
+
+
+def fetch_real_dict_cursor(connector, sql):
+    with connector.conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(sql)
+        data = cur.fetchall()
+        columns = [desc[0] for desc in cur.description]
+        return pd.DataFrame(data, columns=columns)
+
+
+def measure(label, fetch, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = fetch()
+        timings.append(time.perf_counter() - start)
+    # memory is traced in a separate run, as tracing slows down the Python-heavy paths
+    tracemalloc.start()
+    fetch()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    best = min(timings)
+    return {'mode': label, 'rows': len(df), 'best_s': round(best, 3), 'rows_per_s': round(len(df) / best),
+            'peak_python_mb': round(peak / 1024 / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the DQ Postgres connector fetch paths.')
+    parser.add_argument('--db_host', default='localhost')
+    parser.add_argument('--db_port', type=int, default=5434)
+    parser.add_argument('--db_name', default='mydatabase')
+    parser.add_argument('--db_user', required=True)
+    parser.add_argument('--db_password', required=True)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sql = BENCHMARK_QUERY.format(rows=args.rows)
+    with PostgresConnectorContextManager(db_host=args.db_host, db_user=args.db_user, db_password=args.db_password,
+                                         db_port=args.db_port, db_name=args.db_name) as connector:
+        results = [measure('real_dict_cursor', lambda: fetch_real_dict_cursor(connector, sql), args.repeat)]
+        for mode in ['chunked', 'copy']:
+            connector.fetch_mode = mode
+            results.append(measure(mode, lambda: connector.get_data_sql(sql), args.repeat))
+        connector.conn.rollback()
+
+    report = pd.DataFrame(results).set_index('mode')
+    report['speedup'] = (report.loc['real_dict_cursor', 'best_s'] / report['best_s']).round(2)
+    print(report.to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import pyarrow as pa
+
+
+class DataCache:
+    """
+    LRU cache of Arrow tables under a memory budget, optionally persisted to disk as Arrow IPC files.
+
+    Entries are keyed by the caller (parquet path + file mtimes, SQL text + database fingerprint),
+    so a changed input simply misses the cache. Tables larger than the memory budget are only kept on disk.
+    Disk entries are memory-mapped when read back, so a later pytest run skips unchanged reads. The disk cache is
+    kept under its own budget: after every write the least recently used files are removed until it fits,
+    so the entries of outdated mtimes and database fingerprints do not pile up across runs.
+    """
+
+    def __init__(self, memory_budget_mb=1024, cache_dir=None, disk_budget_mb=4096):
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.disk_budget = disk_budget_mb * 1024 * 1024
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def parquet_key(file_path, **read_options):
+        file_path = os.path.abspath(file_path)
+        files = []
+        for root, _, names in os.walk(file_path):
+            for name in names:
+                stat = os.stat(os.path.join(root, name))
+                files.append((os.path.relpath(os.path.join(root, name), file_path), stat.st_mtime_ns, stat.st_size))
+        if os.path.isfile(file_path):
+            stat = os.stat(file_path)
+            files.append(('', stat.st_mtime_ns, stat.st_size))
+        return 'parquet', file_path, tuple(sorted(files)), repr(sorted(read_options.items()))
+
+    @staticmethod
+    def sql_key(sql, params=None, fingerprint=None):
+        # only the ends are trimmed: whitespace inside the query may belong to a string literal
+        return 'sql', sql.strip().rstrip(';').strip(), repr(params), fingerprint
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha256(repr(key).encode()).hexdigest() + '.arrow')
+
+    def get(self, key):
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+        if self.cache_dir and os.path.exists(self._disk_path(key)):
+            try:
+                with pa.memory_map(self._disk_path(key)) as source:
+                    table = pa.ipc.open_file(source).read_all()
+                os.utime(self._disk_path(key))  # mtime is the last use, the order files are pruned in
+            except FileNotFoundError:
+                table = None  # pruned by another process in the meantime
+            if table is not None:
+                self._remember(key, table)
+                with self._lock:
+                    self.hits += 1
+                return table
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, table):
+        self._remember(key, table)
+        if self.cache_dir:
+            path = self._disk_path(key)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, path)
+            self._prune_disk(keep=path)
+
+    def _prune_disk(self, keep):
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not name.endswith('.arrow') or path == keep:
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        size = os.path.getsize(keep) + sum(file_size for _, file_size, _ in files)
+        for _, file_size, path in sorted(files):
+            if size <= self.disk_budget:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue  # removed by another process, or still open (Windows)
+            size -= file_size
+
+    def _remember(self, key, table):
+        with self._lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key).nbytes
+            if table.nbytes > self.memory_budget:
+                return
+            self.entries[key] = table
+            self.size += table.nbytes
+            while self.size > self.memory_budget:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= evicted.nbytes
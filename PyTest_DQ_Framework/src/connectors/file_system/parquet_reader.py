@@ -1,8 +1,63 @@
-import pandas as pd
+import operator
+from functools import reduce
+
+import pyarrow.dataset as ds
+
+FILTER_OPERATORS = {
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda field, values: field.isin(values),
+    'not in': lambda field, values: ~field.isin(values),
+}
+
 
 class ParquetReader:
+    """
+    Reads hive-partitioned parquet datasets through pyarrow.dataset.
+
+    Filters use the pyarrow/pandas notation, e.g. [("partition_date", "=", "2024-01")] (AND of conditions)
+    or [[...], [...]] (OR of ANDs), or a pyarrow.dataset.Expression. Conditions on partition keys prune
+    whole files; conditions on other columns skip row groups through their statistics before the rows
+    are filtered. Partition keys are read as dictionary (categorical) columns, like pd.read_parquet.
+    With a DataCache, read_parquet results are cached by path, file mtimes and read options.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+
+    @staticmethod
+    def dataset(file_path):
+        return ds.dataset(file_path, format='parquet',
+                          partitioning=ds.HivePartitioning.discover(infer_dictionary=True))
+
+    @staticmethod
+    def to_expression(filters):
+        if filters is None or isinstance(filters, ds.Expression):
+            return filters
+        if filters and isinstance(filters[0], tuple):
+            filters = [filters]
+        conjunctions = [
+            reduce(operator.and_, [FILTER_OPERATORS[op](ds.field(col), value) for col, op, value in conjunction])
+            for conjunction in filters
+        ]
+        return reduce(operator.or_, conjunctions)
+
+    def read_parquet(self, file_path, columns=None, filters=None, as_arrow=False):
+        key = self.cache.parquet_key(file_path, columns=columns, filters=filters) if self.cache else None
+        table = self.cache.get(key) if self.cache else None
+        if table is None:
+            table = self.dataset(file_path).to_table(columns=columns, filter=self.to_expression(filters))
+            if self.cache:
+                self.cache.put(key, table)
+        return table if as_arrow else table.to_pandas()
+
     @staticmethod
-    def read_parquet(file_path, columns=None):
-        if columns:
-            return pd.read_parquet(file_path, columns=columns)
-        return pd.read_parquet(file_path)
\ No newline at end of file
+    def iter_batches(file_path, columns=None, filters=None, batch_size=65536):
+        return ParquetReader.dataset(file_path).to_batches(columns=columns,
+                                                           filter=ParquetReader.to_expression(filters),
+                                                           batch_size=batch_size)
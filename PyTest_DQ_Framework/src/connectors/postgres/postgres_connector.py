@@ -1,16 +1,48 @@
+import io
+from uuid import uuid4
+
 import psycopg2
 import pandas as pd
-from psycopg2.extras import RealDictCursor
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+# the WAL insert position moves with every write, committed or not and from any session, so cached results
+# of an older state miss (writes to temporary and unlogged tables are not WAL-logged and go unnoticed)
+DB_FINGERPRINT_QUERY = """
+SELECT pg_postmaster_start_time()::text || ':' ||
+       (CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn() ELSE pg_current_wal_insert_lsn() END)::text
+"""
+
+# Postgres type OID -> Arrow type used to parse the COPY output; other types are left to Arrow's inference.
+# numeric is parsed as float64, so 'copy' results hold floats where 'chunked' results hold Decimals.
+COPY_ARROW_TYPES = {
+    16: pa.bool_(),
+    20: pa.int64(), 21: pa.int64(), 23: pa.int64(),
+    700: pa.float64(), 701: pa.float64(), 1700: pa.float64(),
+    25: pa.string(), 1042: pa.string(), 1043: pa.string(),
+    1082: pa.date32(),
+    1114: pa.timestamp('us'), 1184: pa.timestamp('us', tz='UTC'),
+}
 
 
 class PostgresConnectorContextManager:
-    def __init__(self, db_host: str, db_user: str, db_password: str, db_port: int, db_name='mydatabase', ):
+    """
+    fetch_mode selects how get_data_sql transfers results:
+    'chunked' - tuples fetched from a server-side cursor in chunks of chunk_size rows (default);
+    'copy' - COPY (query) TO STDOUT as CSV, parsed column-wise by Arrow (fastest for large results).
+    """
+
+    def __init__(self, db_host: str, db_user: str, db_password: str, db_port: int, db_name='mydatabase', cache=None,
+                 fetch_mode='chunked', chunk_size=50000):
         self.db_host = db_host
         self.db_name = db_name
         self.db_user = db_user
         self.db_password = db_password
         self.db_port = db_port
         self.conn = None
+        self.cache = cache
+        self.fetch_mode = fetch_mode
+        self.chunk_size = chunk_size
 
     def __enter__(self):
         try:
@@ -19,8 +51,7 @@ class PostgresConnectorContextManager:
                 database=self.db_name,
                 user=self.db_user,
                 password=self.db_password,
-                port=self.db_port,
-                cursor_factory=RealDictCursor
+                port=self.db_port
             )
             return self
         except Exception as e:
@@ -30,13 +61,79 @@ class PostgresConnectorContextManager:
         if self.conn:
             self.conn.close()
 
-    def get_data_sql(self, sql: str) -> pd.DataFrame:
-        with self.conn.cursor() as cur:
-            cur.execute(sql)
-            data = cur.fetchall()
+    def get_data_sql(self, sql: str, params=None) -> pd.DataFrame:
+        if self.cache is None:
+            return self._fetch_data_sql(sql, params)
+        key = self.cache.sql_key(f'{self.db_host}:{self.db_port}/{self.db_name}\n{sql}', params, self.fingerprint())
+        table = self.cache.get(key)
+        if table is not None:
+            return table.to_pandas()
+        df = self._fetch_data_sql(sql, params)
+        try:
+            self.cache.put(key, pa.Table.from_pandas(df, preserve_index=False))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass  # columns Arrow cannot represent are simply not cached
+        return df
+
+    def fingerprint(self):
+        """Taken before every cached read, so a write made since the last read (by a test, too) is seen."""
+        with self.conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+            cur.execute(DB_FINGERPRINT_QUERY)
+            return cur.fetchone()[0]
+
+    def _fetch_data_sql(self, sql: str, params=None) -> pd.DataFrame:
+        if self.fetch_mode == 'copy':
+            return self.copy_data_sql(sql, params).to_pandas()
+        if self.fetch_mode == 'chunked':
+            return self.fetch_data_sql_chunked(sql, params)
+        raise ValueError(f"Unsupported fetch mode: {self.fetch_mode}")
+
+    def iter_chunks_sql(self, sql: str, params=None, chunk_size=None):
+        """
+        Yields the result as DataFrames of up to chunk_size rows read from a server-side cursor
+        (one empty DataFrame with the result columns for an empty result).
+        """
+        chunk_size = chunk_size or self.chunk_size
+        with self.conn.cursor(name=f'dq_fetch_{uuid4().hex}') as cur:
+            cur.itersize = chunk_size
+            cur.execute(sql, params)
+            rows = cur.fetchmany(chunk_size)
             columns = [desc[0] for desc in cur.description]
-            df = pd.DataFrame(data, columns=columns)
-            return df
+            while True:
+                yield pd.DataFrame.from_records(rows, columns=columns)
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+
+    def iter_batches_sql(self, sql: str, params=None, chunk_size=None):
+        """Yields the result as Arrow record batches, the input of the streaming DQ checks."""
+        for chunk in self.iter_chunks_sql(sql, params, chunk_size):
+            yield pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+
+    def fetch_data_sql_chunked(self, sql: str, params=None) -> pd.DataFrame:
+        chunks = list(self.iter_chunks_sql(sql, params))
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+    def copy_data_sql(self, sql: str, params=None) -> pa.Table:
+        with self.conn.cursor() as cur:
+            query = cur.mogrify(sql, params).decode().strip().rstrip(';')
+            cur.execute(f'SELECT * FROM ({query}) AS q LIMIT 0')
+            description = cur.description
+            buffer = io.BytesIO()
+            cur.copy_expert(f'COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER false)', buffer)
+        buffer.seek(0)
+        columns = [desc[0] for desc in description]
+        return pacsv.read_csv(
+            buffer,
+            read_options=pacsv.ReadOptions(column_names=columns),
+            convert_options=pacsv.ConvertOptions(
+                column_types={desc[0]: COPY_ARROW_TYPES[desc[1]] for desc in description if desc[1] in COPY_ARROW_TYPES},
+                strings_can_be_null=True,
+                quoted_strings_can_be_null=False,
+                true_values=['t'],
+                false_values=['f']
+            )
+        )
 
 #
 # import psycopg2
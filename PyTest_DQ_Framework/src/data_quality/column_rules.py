@@ -0,0 +1,81 @@
+import numbers
+
+import numpy as np
+import pandas as pd
+
+
+class RuleViolations:
+    """
+    Outcome of a column rule validation: violations per (column, rule) and a sample of the violating rows.
+    """
+
+    def __init__(self, counts, sample):
+        self.counts = counts
+        self.sample = sample
+
+    @property
+    def is_valid(self):
+        return int(self.counts['violations'].sum()) == 0
+
+    def __str__(self):
+        failed = self.counts[self.counts['violations'] > 0]
+        return f"Column rule violations:\n{failed.to_string(index=False)}\nSample rows:\n{self.sample.to_string()}"
+
+
+class ColumnRuleEngine:
+    """
+    Compiles declarative column rules, e.g. {"sum_treatment_cost": {"min": 0, "not_null": True}}, into vectorized
+    boolean masks. Supported rules: min, max (inclusive bounds), allowed (set of values), regex (full match)
+    and not_null. Each column is read and coerced once; all its rules are evaluated on that series, and the
+    violations of every rule are OR-ed into one row mask used to sample the offending rows.
+    Rules other than not_null ignore nulls.
+    """
+    RULES = ('min', 'max', 'allowed', 'regex', 'not_null')
+
+    def __init__(self, column_rules, sample_size=5):
+        for column, rules in column_rules.items():
+            unknown = set(rules) - set(self.RULES)
+            if unknown:
+                raise ValueError(f"Unknown rule(s) {sorted(unknown)} for column {column}; supported: {self.RULES}")
+        self.column_rules = column_rules
+        self.sample_size = sample_size
+
+    @staticmethod
+    def numeric(series):
+        if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return series, np.zeros(len(series), dtype=bool)
+        # e.g. Decimal objects read from parquet or Postgres; values that do not convert are violations
+        converted = pd.to_numeric(series, errors='coerce')
+        return converted, (converted.isna() & series.notna()).to_numpy()
+
+    def column_masks(self, series, rules):
+        present = series.notna().to_numpy()
+        masks = {}
+        if rules.get('not_null'):
+            masks['not_null'] = ~present
+        if 'min' in rules or 'max' in rules:
+            bounded = series
+            not_numeric = np.zeros(len(series), dtype=bool)
+            if any(isinstance(rules.get(bound), numbers.Number) for bound in ('min', 'max')):
+                bounded, not_numeric = self.numeric(series)
+            for bound, outside in (('min', bounded.lt), ('max', bounded.gt)):
+                if bound in rules:
+                    masks[bound] = (outside(rules[bound]).to_numpy(dtype=bool, na_value=False) & present) | not_numeric
+        if 'allowed' in rules:
+            masks['allowed'] = ~series.isin(list(rules['allowed'])).to_numpy(dtype=bool) & present
+        if 'regex' in rules:
+            matches = series.astype(str).str.fullmatch(rules['regex']).to_numpy(dtype=bool, na_value=False)
+            masks['regex'] = ~matches & present
+        return masks
+
+    def validate(self, df):
+        counts = []
+        any_violation = np.zeros(len(df), dtype=bool)
+        for column, rules in self.column_rules.items():
+            if column not in df.columns:
+                raise KeyError(f"Column {column} from the rules is not in the data set")
+            for rule, mask in self.column_masks(df[column], rules).items():
+                counts.append({'column': column, 'rule': rule, 'expected': rules[rule], 'violations': int(mask.sum())})
+                any_violation |= mask
+        sample = df.iloc[np.flatnonzero(any_violation)[:self.sample_size]]
+        return RuleViolations(pd.DataFrame(counts, columns=['column', 'rule', 'expected', 'violations']), sample)
@@ -0,0 +1,97 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnProfile:
+    """
+    Statistics of a single column, derived from one factorization of its values.
+    """
+
+    def __init__(self, series):
+        self.codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        self.null_count = int((self.codes == -1).sum())
+        self.cardinality = len(uniques)
+        self.distinct_count = self.cardinality + (1 if self.null_count else 0)
+        # min/max only need to look at the distinct values, not at every row
+        try:
+            self.min_value = pd.Series(uniques).min() if self.cardinality else None
+            self.max_value = pd.Series(uniques).max() if self.cardinality else None
+        except TypeError:
+            self.min_value = self.max_value = None
+
+
+class DataProfile:
+    """
+    Cached profile of a DataFrame: row count and, per column, null count, distinct count and min/max.
+
+    Every column is factorized once; duplicate-key counts for any subset of columns are then computed
+    from the integer codes instead of hashing the rows again.
+    """
+
+    def __init__(self, df):
+        self.row_count = len(df)
+        self.columns = {col: ColumnProfile(df[col]) for col in df.columns}
+        self._duplicate_counts = {}
+
+    def null_counts(self, column_names=None):
+        return {col: self.columns[col].null_count for col in column_names or self.columns}
+
+    def distinct_counts(self, column_names=None):
+        return {col: self.columns[col].distinct_count for col in column_names or self.columns}
+
+    def min_max(self, column_names=None):
+        return {col: (self.columns[col].min_value, self.columns[col].max_value) for col in column_names or self.columns}
+
+    def duplicate_count(self, column_names=None):
+        key_columns = tuple(column_names or self.columns)
+        if key_columns not in self._duplicate_counts:
+            self._duplicate_counts[key_columns] = self._count_duplicates(key_columns)
+        return self._duplicate_counts[key_columns]
+
+    def _count_duplicates(self, key_columns):
+        if self.row_count == 0:
+            return 0
+        # Combine the per-column codes into one int64 key per row (mixed radix, nulls as 0),
+        # compressing the key whenever the next column could overflow it.
+        key = np.zeros(self.row_count, dtype=np.int64)
+        bound = 1
+        for col in key_columns:
+            column = self.columns[col]
+            size = column.cardinality + 1
+            if bound * size >= np.iinfo(np.int64).max:
+                key, uniques = pd.factorize(key)
+                bound = len(uniques)
+            key = key * size + (column.codes + 1)
+            bound *= size
+        return int(self.row_count - len(pd.unique(key)))
+
+    def summary(self):
+        return pd.DataFrame({
+            'null_count': self.null_counts(),
+            'distinct_count': self.distinct_counts(),
+            'min': {col: profile.min_value for col, profile in self.columns.items()},
+            'max': {col: profile.max_value for col, profile in self.columns.items()},
+        }).assign(row_count=self.row_count)
+
+
+class DataProfiler:
+    """
+    Builds and caches one DataProfile per DataFrame object, so the checks of a test module share one pass
+    over a module-scoped fixture. The cache entry is dropped when the DataFrame is garbage collected;
+    call invalidate() after modifying a profiled DataFrame in place.
+    """
+    _profiles = {}
+
+    @classmethod
+    def profile(cls, df):
+        key = id(df)
+        if key not in cls._profiles:
+            cls._profiles[key] = DataProfile(df)
+            weakref.finalize(df, cls._profiles.pop, key, None)
+        return cls._profiles[key]
+
+    @classmethod
+    def invalidate(cls, df):
+        cls._profiles.pop(id(df), None)
@@ -1,21 +1,32 @@
-import pandas as pd
+
+from src.data_quality.column_rules import ColumnRuleEngine
+from src.data_quality.data_profiler import DataProfiler
+from src.data_quality.reconciliation import DataReconciler
+
 
 class DataQualityLibrary:
+    @staticmethod
+    def profile(df):
+        return DataProfiler.profile(df)
+
     @staticmethod
     def check_duplicates(df, column_names=None):
-        if column_names:
-            duplicates = df.duplicated(subset=column_names)
-        else:
-            duplicates = df.duplicated()
-        assert not duplicates.any(), f"Found duplicate rows in columns: {column_names if column_names else 'all columns'}"
+        duplicate_count = DataProfiler.profile(df).duplicate_count(column_names)
+        assert duplicate_count == 0, \
+            f"Found {duplicate_count} duplicate rows in columns: {column_names if column_names else 'all columns'}"
 
     @staticmethod
     def check_count(df1, df2):
         assert len(df1) == len(df2), f"Row count mismatch: {len(df1)} != {len(df2)}"
 
     @staticmethod
-    def check_data_full_data_set(df1, df2):
-        pd.testing.assert_frame_equal(df1.reset_index(drop=True), df2.reset_index(drop=True))
+    def reconcile(df1, df2, key_columns=None, sample_size=5):
+        return DataReconciler(sample_size=sample_size).reconcile(df1, df2, key_columns=key_columns)
+
+    @staticmethod
+    def check_data_full_data_set(df1, df2, key_columns=None, sample_size=5):
+        result = DataReconciler(sample_size=sample_size).reconcile(df1, df2, key_columns=key_columns)
+        assert result.is_match, f"Data sets differ\n{result}"
 
     @staticmethod
     def check_dataset_is_not_empty(df):
@@ -23,10 +34,14 @@ class DataQualityLibrary:
 
     @staticmethod
     def check_not_null_values(df, column_names=None):
-        if column_names is None:
-            column_names = df.columns
-        for col in column_names:
-            assert df[col].notnull().all(), f"Null values found in column: {col}"
+        null_counts = DataProfiler.profile(df).null_counts(column_names)
+        for col, null_count in null_counts.items():
+            assert null_count == 0, f"Null values found in column: {col} ({null_count} rows)"
+
+    @staticmethod
+    def check_column_validity(df, column_rules, sample_size=5):
+        result = ColumnRuleEngine(column_rules, sample_size=sample_size).validate(df)
+        assert result.is_valid, str(result)
 
 # import pandas as pd
 #
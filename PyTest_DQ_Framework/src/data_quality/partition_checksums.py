@@ -0,0 +1,128 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from psycopg2 import extensions, sql
+
+from src.connectors.file_system.parquet_reader import ParquetReader
+
+NULL_TEXT = '\\N'
+CHECKSUM_MODULUS = 2 ** 64
+
+
+class PartitionChecksums:
+    """
+    Per-partition row counts and order-independent checksums computed identically on both sides:
+    with Arrow compute over a parquet dataset and with a grouped aggregate inside Postgres.
+
+    Every row is rendered as canonical text (numbers scaled to integers, dates and timestamps in ISO form,
+    NULLs as \\N, columns joined with '|'); its checksum is the first 60 bits of the MD5 of that text,
+    and a partition checksum is the sum of its row checksums modulo 2**64.
+    The column kinds are taken from the parquet schema, so both sides render a column the same way.
+    """
+
+    def __init__(self, parquet_path, partition_column, scale=2):
+        self.dataset = ParquetReader.dataset(parquet_path)
+        self.partition_column = partition_column
+        self.scale = scale
+        self.columns = [f.name for f in self.dataset.schema if f.name != partition_column]
+        self.kinds = {f.name: self.column_kind(f.type) for f in self.dataset.schema if f.name != partition_column}
+
+    @staticmethod
+    def column_kind(data_type):
+        if pa.types.is_dictionary(data_type):
+            data_type = data_type.value_type
+        if pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_decimal(data_type):
+            return 'number'
+        if pa.types.is_date(data_type):
+            return 'date'
+        if pa.types.is_timestamp(data_type):
+            return 'timestamp'
+        return 'text'
+
+    def arrow_text(self, array, kind):
+        if pa.types.is_dictionary(array.type):
+            array = array.dictionary_decode()
+        if kind == 'number':
+            scaled = pc.round(pc.multiply(pc.cast(array, pa.float64()), 10 ** self.scale),
+                              round_mode='half_towards_infinity')  # like Postgres ROUND(numeric)
+            text = pc.cast(pc.cast(scaled, pa.int64()), pa.string())
+        elif kind == 'date':
+            text = pc.strftime(pc.cast(array, pa.timestamp('s')), format='%Y-%m-%d')
+        elif kind == 'timestamp':
+            # whole seconds, like TO_CHAR(..., 'HH24:MI:SS'); strftime of a [ns] timestamp adds the fraction
+            seconds = pc.cast(array, pa.timestamp('s', tz=array.type.tz), safe=False)
+            text = pc.strftime(seconds, format='%Y-%m-%d %H:%M:%S')
+        else:
+            text = pc.cast(array, pa.string())
+        return pc.fill_null(text, NULL_TEXT)
+
+    def sql_text(self, column, kind):
+        identifier = sql.Identifier(column)
+        if kind == 'number':
+            text = sql.SQL('ROUND({}::numeric * {})::bigint::text').format(identifier, sql.Literal(10 ** self.scale))
+        elif kind == 'date':
+            text = sql.SQL("TO_CHAR({}, 'YYYY-MM-DD')").format(identifier)
+        elif kind == 'timestamp':
+            text = sql.SQL("TO_CHAR({}, 'YYYY-MM-DD HH24:MI:SS')").format(identifier)
+        else:
+            text = sql.SQL('{}::text').format(identifier)
+        return sql.SQL('COALESCE({}, {})').format(text, sql.Literal(NULL_TEXT))
+
+    def row_texts(self, batch):
+        texts = [self.arrow_text(batch.column(col), self.kinds[col]) for col in self.columns]
+        return pc.binary_join_element_wise(*texts, '|')
+
+    @staticmethod
+    def row_hashes(texts):
+        # Arrow has no MD5 kernel, so this is the one per-row Python step (about 1 s per million rows)
+        md5 = hashlib.md5
+        return np.fromiter((int.from_bytes(md5(text).digest()[:8], 'big') >> 4
+                            for text in pc.cast(texts, pa.binary()).to_pylist()),
+                           dtype=np.uint64, count=len(texts))
+
+    def parquet_checksums(self, partitions=None):
+        hashes, partition_values = [], []
+        scanner_filter = pc.field(self.partition_column).isin(partitions) if partitions else None
+        for batch in self.dataset.to_batches(columns=self.columns + [self.partition_column], filter=scanner_filter):
+            if batch.num_rows == 0:
+                continue
+            hashes.append(self.row_hashes(self.row_texts(batch)))
+            partition_values.append(pc.cast(batch.column(self.partition_column), pa.string()))
+
+        hashes = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+        codes, uniques = pd.factorize(pa.chunked_array(partition_values, type=pa.string()).to_numpy())
+        checksums = np.zeros(len(uniques), dtype=np.uint64)
+        np.add.at(checksums, codes, hashes)  # wraps around modulo 2**64
+        return pd.DataFrame({
+            'partition': list(uniques),
+            'row_count': np.bincount(codes, minlength=len(uniques)),
+            'checksum': [int(checksum) for checksum in checksums]
+        }).set_index('partition')
+
+    def sql_checksums(self, db_connection, query):
+        row_text = sql.SQL('CONCAT_WS({}, {})').format(
+            sql.Literal('|'), sql.SQL(', ').join(self.sql_text(col, self.kinds[col]) for col in self.columns))
+        checksum_query = sql.SQL(
+            "SELECT {partition}::text AS partition, COUNT(*) AS row_count, "
+            "SUM(('x' || SUBSTR(MD5({row_text}), 1, 15))::bit(60)::bigint::numeric) % {modulus} AS checksum "
+            "FROM ({query}) AS checked GROUP BY 1"
+        ).format(partition=sql.Identifier(self.partition_column), row_text=row_text,
+                 modulus=sql.Literal(CHECKSUM_MODULUS), query=sql.SQL(query.strip().rstrip(';')))
+        with db_connection.conn.cursor(cursor_factory=extensions.cursor) as cur:
+            cur.execute(checksum_query)
+            rows = cur.fetchall()
+        return pd.DataFrame({
+            'partition': [row[0] for row in rows],
+            'row_count': [int(row[1]) for row in rows],
+            'checksum': [int(row[2]) for row in rows]
+        }).set_index('partition')
+
+    @staticmethod
+    def mismatched_partitions(parquet_checksums, sql_checksums):
+        joined = parquet_checksums.join(sql_checksums, how='outer', lsuffix='_parquet', rsuffix='_sql')
+        mismatch = (joined['row_count_parquet'] != joined['row_count_sql']) | \
+                   (joined['checksum_parquet'] != joined['checksum_sql'])
+        return joined[mismatch]
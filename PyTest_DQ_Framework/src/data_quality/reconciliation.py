@@ -0,0 +1,183 @@
+import datetime
+import decimal
+
+import numpy as np
+import pandas as pd
+
+
+class ReconciliationResult:
+    """
+    Outcome of an order-insensitive comparison of two datasets.
+
+    missing: rows of the first dataset absent from the second.
+    extra: rows of the second dataset absent from the first.
+    changed: keys present in both datasets with different values (only when key columns are given).
+    duplicate keys: keys found more than once in either dataset; their rows are compared as a multiset
+    of full rows and counted in missing/extra.
+    The *_sample attributes hold up to sample_size of those rows (keys with their counts for duplicate keys).
+    """
+
+    def __init__(self, row_counts, missing_count, extra_count, changed_count,
+                 missing_sample, extra_sample, changed_sample, column_mismatch=None,
+                 duplicate_key_count=0, duplicate_key_sample=None):
+        self.row_counts = row_counts
+        self.missing_count = missing_count
+        self.extra_count = extra_count
+        self.changed_count = changed_count
+        self.missing_sample = missing_sample
+        self.extra_sample = extra_sample
+        self.changed_sample = changed_sample
+        self.column_mismatch = column_mismatch
+        self.duplicate_key_count = duplicate_key_count
+        self.duplicate_key_sample = duplicate_key_sample
+
+    @property
+    def is_match(self):
+        return not self.column_mismatch and self.missing_count == self.extra_count == self.changed_count == 0
+
+    def __str__(self):
+        if self.column_mismatch:
+            return f"Column mismatch: {self.column_mismatch}"
+        lines = [f"Row counts: {self.row_counts[0]} vs {self.row_counts[1]}; "
+                 f"missing: {self.missing_count}, extra: {self.extra_count}, changed: {self.changed_count}, "
+                 f"duplicate keys: {self.duplicate_key_count}"]
+        for title, sample in [('Missing rows', self.missing_sample), ('Extra rows', self.extra_sample),
+                              ('Changed rows', self.changed_sample), ('Duplicate keys', self.duplicate_key_sample)]:
+            if sample is not None and not sample.empty:
+                lines.append(f"{title} (sample):\n{sample.to_string()}")
+        return '\n'.join(lines)
+
+
+class DataReconciler:
+    """
+    Compares two DataFrames through vectorized 64-bit row hashes (pd.util.hash_pandas_object), so the
+    comparison ignores row order and only keeps hash arrays besides the inputs.
+
+    Without key columns rows are compared as a multiset of full-row hashes. With key columns rows are
+    matched on the key hash and compared on the hash of the value columns, which also reports changed rows;
+    rows of keys that are not unique fall back to the multiset comparison and are reported as duplicate keys.
+    Columns are normalized first, so values read from parquet and from Postgres compare equal when they
+    hold the same data: categoricals are decoded, Decimals and integers become floats, dates become datetimes.
+    """
+
+    def __init__(self, sample_size=5, float_decimals=None):
+        self.sample_size = sample_size
+        self.float_decimals = float_decimals
+
+    def normalize_column(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(series.cat.categories.dtype)
+        if series.dtype == object:
+            first = series.dropna().head(1)
+            if not first.empty and isinstance(first.iloc[0], decimal.Decimal):
+                series = series.astype('float64')
+            elif not first.empty and isinstance(first.iloc[0], datetime.date):
+                series = pd.to_datetime(series)
+        if pd.api.types.is_bool_dtype(series.dtype):
+            return series
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            series = series.astype('float64')
+            if self.float_decimals is not None:
+                series = series.round(self.float_decimals)
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            if getattr(series.dt, 'tz', None) is not None:
+                series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+            series = series.astype('datetime64[ns]')
+        elif pd.api.types.is_string_dtype(series.dtype):
+            series = series.astype(object)
+        return series
+
+    def hash_rows(self, df, columns):
+        # one normalized column at a time, so the extra memory is one column plus the hash array
+        hashes = np.zeros(len(df), dtype=np.uint64)
+        for col in columns:
+            column_hashes = pd.util.hash_pandas_object(self.normalize_column(df[col]), index=False).to_numpy()
+            hashes = (hashes * np.uint64(1000003)) ^ column_hashes
+        return hashes
+
+    def sample(self, df, mask):
+        return df.iloc[np.flatnonzero(mask)[:self.sample_size]]
+
+    def reconcile(self, df1, df2, key_columns=None):
+        if set(df1.columns) != set(df2.columns):
+            return ReconciliationResult(
+                (len(df1), len(df2)), 0, 0, 0, None, None, None,
+                column_mismatch=f"only in first: {sorted(set(df1.columns) - set(df2.columns))}, "
+                                f"only in second: {sorted(set(df2.columns) - set(df1.columns))}")
+        columns = list(df1.columns)
+        if key_columns:
+            return self._reconcile_by_key(df1, df2, list(key_columns), [c for c in columns if c not in key_columns])
+        return self._reconcile_rows(df1, df2, columns)
+
+    def _reconcile_rows(self, df1, df2, columns):
+        hashes1, hashes2 = self.hash_rows(df1, columns), self.hash_rows(df2, columns)
+        counts = pd.concat([pd.Series(hashes1).value_counts().rename('first'),
+                            pd.Series(hashes2).value_counts().rename('second')], axis=1).fillna(0)
+        surplus = counts['first'] - counts['second']
+        missing_hashes, extra_hashes = surplus.index[surplus > 0], surplus.index[surplus < 0]
+        return ReconciliationResult(
+            (len(df1), len(df2)),
+            int(surplus[surplus > 0].sum()),
+            int(-surplus[surplus < 0].sum()),
+            0,
+            self.sample(df1, np.isin(hashes1, missing_hashes)),
+            self.sample(df2, np.isin(hashes2, extra_hashes)),
+            None)
+
+    def duplicate_keys(self, df1, df2, keys1, keys2, key_columns, duplicate_hashes):
+        counts = pd.concat([pd.Series(keys1).value_counts().rename('first_count'),
+                            pd.Series(keys2).value_counts().rename('second_count')], axis=1)
+        counts = counts.reindex(duplicate_hashes[:self.sample_size]).fillna(0).astype('int64')
+        rows = pd.concat([df1[key_columns].assign(_key=keys1), df2[key_columns].assign(_key=keys2)])
+        rows = rows.drop_duplicates('_key').set_index('_key').loc[counts.index]
+        return pd.concat([rows, counts], axis=1).reset_index(drop=True)
+
+    def _reconcile_by_key(self, df1, df2, key_columns, value_columns):
+        keys1, keys2 = self.hash_rows(df1, key_columns), self.hash_rows(df2, key_columns)
+        duplicate_hashes = np.union1d(keys1[pd.Series(keys1).duplicated().to_numpy()],
+                                      keys2[pd.Series(keys2).duplicated().to_numpy()])
+        if len(duplicate_hashes) == 0:
+            return self._reconcile_unique_keys(df1, df2, keys1, keys2, value_columns)
+
+        duplicated1, duplicated2 = np.isin(keys1, duplicate_hashes), np.isin(keys2, duplicate_hashes)
+        by_key = self._reconcile_unique_keys(df1[~duplicated1], df2[~duplicated2], keys1[~duplicated1],
+                                             keys2[~duplicated2], value_columns)
+        by_rows = self._reconcile_rows(df1[duplicated1], df2[duplicated2], list(df1.columns))
+        return ReconciliationResult(
+            (len(df1), len(df2)),
+            by_key.missing_count + by_rows.missing_count,
+            by_key.extra_count + by_rows.extra_count,
+            by_key.changed_count,
+            pd.concat([by_key.missing_sample, by_rows.missing_sample]).head(self.sample_size),
+            pd.concat([by_key.extra_sample, by_rows.extra_sample]).head(self.sample_size),
+            by_key.changed_sample,
+            duplicate_key_count=len(duplicate_hashes),
+            duplicate_key_sample=self.duplicate_keys(df1, df2, keys1, keys2, key_columns, duplicate_hashes))
+
+    def _reconcile_unique_keys(self, df1, df2, keys1, keys2, value_columns):
+        values1 = self.hash_rows(df1, value_columns) if value_columns else np.zeros(len(df1), dtype=np.uint64)
+        values2 = self.hash_rows(df2, value_columns) if value_columns else np.zeros(len(df2), dtype=np.uint64)
+
+        in_second = np.isin(keys1, keys2)
+        in_first = np.isin(keys2, keys1)
+        # align the rows of the second dataset to the rows of the first through the key hash
+        key_index = pd.Index(keys2)
+        position = key_index.get_indexer(keys1[in_second])
+        changed = np.zeros(len(df1), dtype=bool)
+        changed[np.flatnonzero(in_second)[values1[in_second] != values2[position]]] = True
+
+        changed_sample = None
+        if changed.any():
+            sample_positions = np.flatnonzero(changed)[:self.sample_size]
+            rows1 = df1.iloc[sample_positions]
+            rows2 = df2.iloc[key_index.get_indexer(keys1[sample_positions])]
+            changed_sample = pd.concat({'first': rows1.reset_index(drop=True), 'second': rows2.reset_index(drop=True)},
+                                       axis=1)
+        return ReconciliationResult(
+            (len(df1), len(df2)),
+            int((~in_second).sum()),
+            int((~in_first).sum()),
+            int(changed.sum()),
+            self.sample(df1, ~in_second),
+            self.sample(df2, ~in_first),
+            changed_sample)
@@ -0,0 +1,119 @@
+from psycopg2 import extensions, sql
+
+from src.connectors.file_system.parquet_reader import ParquetReader
+from src.data_quality.partition_checksums import PartitionChecksums
+from src.data_quality.reconciliation import DataReconciler
+
+# Postgres types without MIN/MAX aggregates: bool, json, xml, point, jsonb
+UNORDERED_TYPE_OIDS = {16, 114, 142, 600, 3802}
+
+
+class SqlTableProfile:
+    """
+    Profile of a query result computed inside Postgres: row count, null counts and min/max of every column
+    in one aggregate query, plus duplicate counts per key, so only scalars cross the wire.
+    """
+
+    def __init__(self, db_connection, query):
+        self.db_connection = db_connection
+        self.relation = sql.SQL('({}) AS checked').format(sql.SQL(query.strip().rstrip(';')))
+        self.columns, orderable = self._describe()
+
+        aggregates = [sql.SQL('COUNT(*)')]
+        for col in self.columns:
+            aggregates.append(sql.SQL('COUNT(*) - COUNT({})').format(sql.Identifier(col)))
+        for col in orderable:
+            aggregates.append(sql.SQL('MIN({0}), MAX({0})').format(sql.Identifier(col)))
+        values = self._fetch_row(sql.SQL('SELECT {} FROM {}').format(sql.SQL(', ').join(aggregates), self.relation))
+
+        self.row_count = values[0]
+        self.null_counts = dict(zip(self.columns, values[1:len(self.columns) + 1]))
+        min_max = values[len(self.columns) + 1:]
+        self.min_max = {col: (min_max[2 * i], min_max[2 * i + 1]) for i, col in enumerate(orderable)}
+        self._duplicate_counts = {}
+
+    def _cursor(self):
+        # a plain tuple cursor, whatever cursor_factory the connection uses: the aggregate columns have
+        # repeated names (count, min, max) that a dict row would collapse
+        return self.db_connection.conn.cursor(cursor_factory=extensions.cursor)
+
+    def _describe(self):
+        with self._cursor() as cur:
+            cur.execute(sql.SQL('SELECT * FROM {} LIMIT 0').format(self.relation))
+            description = cur.description
+        columns = [desc[0] for desc in description]
+        orderable = [desc[0] for desc in description if desc[1] not in UNORDERED_TYPE_OIDS]
+        return columns, orderable
+
+    def _fetch_row(self, query):
+        with self._cursor() as cur:
+            cur.execute(query)
+            return list(cur.fetchone())
+
+    def duplicate_count(self, column_names=None):
+        key_columns = tuple(column_names or self.columns)
+        if key_columns not in self._duplicate_counts:
+            # DISTINCT treats NULLs as equal, like pandas' duplicated()
+            query = sql.SQL('SELECT COUNT(*) - (SELECT COUNT(*) FROM (SELECT DISTINCT {} FROM {}) AS d) FROM {}').format(
+                sql.SQL(', ').join(map(sql.Identifier, key_columns)), self.relation, self.relation)
+            self._duplicate_counts[key_columns] = self._fetch_row(query)[0]
+        return self._duplicate_counts[key_columns]
+
+
+class SqlDataQualityLibrary:
+    """
+    DataQualityLibrary checks pushed down to Postgres. Checks take the SQL query of the target data set
+    instead of a DataFrame; the profile of each query is computed once and shared by all checks on it.
+    """
+
+    def __init__(self, db_connection):
+        self.db_connection = db_connection
+        self._profiles = {}
+
+    def profile(self, query):
+        if query not in self._profiles:
+            self._profiles[query] = SqlTableProfile(self.db_connection, query)
+        return self._profiles[query]
+
+    def check_dataset_is_not_empty(self, query):
+        assert self.profile(query).row_count > 0, "Query result is empty"
+
+    def check_count(self, df, query):
+        row_count = self.profile(query).row_count
+        assert len(df) == row_count, f"Row count mismatch: {len(df)} != {row_count}"
+
+    def check_duplicates(self, query, column_names=None):
+        duplicate_count = self.profile(query).duplicate_count(column_names)
+        assert duplicate_count == 0, \
+            f"Found {duplicate_count} duplicate rows in columns: {column_names if column_names else 'all columns'}"
+
+    def check_not_null_values(self, query, column_names=None):
+        null_counts = self.profile(query).null_counts
+        for col in column_names or null_counts:
+            assert null_counts[col] == 0, f"Null values found in column: {col} ({null_counts[col]} rows)"
+
+    def check_value_range(self, query, column_ranges):
+        min_max = self.profile(query).min_max
+        for col, (low, high) in column_ranges.items():
+            min_value, max_value = min_max[col]
+            assert low is None or min_value is None or min_value >= low, \
+                f"Values below {low} found in column: {col} (min {min_value})"
+            assert high is None or max_value is None or max_value <= high, \
+                f"Values above {high} found in column: {col} (max {max_value})"
+
+    def check_partitions_match(self, parquet_path, query, partition_column, key_columns=None, sample_size=5):
+        checksums = PartitionChecksums(parquet_path, partition_column)
+        mismatched = checksums.mismatched_partitions(checksums.parquet_checksums(),
+                                                     checksums.sql_checksums(self.db_connection, query))
+        if mismatched.empty:
+            return
+        # row-level diff only for the partitions whose row count or checksum disagree
+        partitions = [str(partition) for partition in mismatched.index]
+        source = ParquetReader().read_parquet(parquet_path, filters=[(partition_column, 'in', partitions)])
+        target = self.db_connection.get_data_sql(
+            sql.SQL('SELECT * FROM ({}) AS checked WHERE {}::text = ANY(%s)').format(
+                sql.SQL(query.strip().rstrip(';').replace('%', '%%')), sql.Identifier(partition_column)
+            ).as_string(self.db_connection.conn),
+            (partitions,))
+        result = DataReconciler(sample_size=sample_size).reconcile(source, target, key_columns=key_columns)
+        raise AssertionError(f"{len(partitions)} partition(s) differ:\n{mismatched.to_string()}\n{result}")
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+NULL_KEY_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+class StreamingProfile:
+    """
+    Mergeable profile of a data set consumed as a stream of Arrow record batches (ParquetReader.iter_batches,
+    PostgresConnectorContextManager.iter_batches_sql), so the checks never hold the whole data set in memory.
+
+    State: row count, null counts (NaN counts as null, like pandas), min/max per column and, for duplicate
+    checks, the set of 64-bit hashes of the key columns, compacted every compact_rows hashes, so memory
+    grows with the distinct keys (8 bytes each) rather than with the rows.
+    Keys are hashed in a canonical type (numbers as float64, timestamps in ns, dictionaries decoded) with one hash
+    for every null, so equal keys match however each batch happens to be typed, like in a single DataFrame.
+    Profiles of disjoint parts of a data set can be combined with merge().
+    """
+
+    def __init__(self, key_columns=None, compact_rows=1_000_000):
+        self.key_columns = key_columns
+        self.compact_rows = compact_rows
+        self.row_count = 0
+        self.null_counts = {}
+        self.min_max = {}
+        self._unique_hashes = np.empty(0, dtype=np.uint64)
+        self._pending_hashes = []
+        self._pending_rows = 0
+        self._duplicates = 0
+
+    @classmethod
+    def from_batches(cls, batches, key_columns=None):
+        profile = cls(key_columns=key_columns)
+        for batch in batches:
+            profile.update(batch)
+        return profile
+
+    @staticmethod
+    def _merge_min_max(current, new):
+        if current is None:
+            return new
+        lows = [value for value in (current[0], new[0]) if value is not None]
+        highs = [value for value in (current[1], new[1]) if value is not None]
+        return min(lows, default=None), max(highs, default=None)
+
+    def update(self, batch):
+        if isinstance(batch, pd.DataFrame):
+            batch = pa.Table.from_pandas(batch, preserve_index=False)
+        self.row_count += batch.num_rows
+        for name, column in zip(batch.schema.names, batch.columns):
+            nulls = column.null_count
+            if pa.types.is_floating(column.type):
+                nulls += pc.sum(pc.is_nan(column)).as_py() or 0
+            self.null_counts[name] = self.null_counts.get(name, 0) + nulls
+            if pa.types.is_dictionary(column.type):
+                column = column.cast(column.type.value_type)
+            try:
+                min_max = pc.min_max(column)
+            except (pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                continue
+            self.min_max[name] = self._merge_min_max(self.min_max.get(name),
+                                                     (min_max['min'].as_py(), min_max['max'].as_py()))
+        if batch.num_rows:
+            self._add_hashes(self._key_hashes(batch))
+
+    @staticmethod
+    def _canonical_column(column):
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        data_type = column.type
+        if pa.types.is_null(data_type) or pa.types.is_integer(data_type) or pa.types.is_floating(data_type) \
+                or pa.types.is_decimal(data_type):
+            return column.cast(pa.float64())
+        if pa.types.is_timestamp(data_type):
+            return column.cast(pa.timestamp('ns', tz=data_type.tz))
+        if pa.types.is_date(data_type):
+            return column.cast(pa.date32())
+        if pa.types.is_large_string(data_type):
+            return column.cast(pa.string())
+        return column
+
+    def _key_hashes(self, batch):
+        hashes = np.zeros(batch.num_rows, dtype=np.uint64)
+        for col in self.key_columns or batch.schema.names:
+            column = self._canonical_column(batch.column(col))
+            column_hashes = pd.util.hash_pandas_object(column.to_pandas(), index=False).to_numpy(copy=True)
+            column_hashes[np.asarray(pc.is_null(column, nan_is_null=True))] = NULL_KEY_HASH
+            hashes = (hashes * np.uint64(1000003)) ^ column_hashes
+        return hashes
+
+    def _add_hashes(self, hashes):
+        self._pending_hashes.append(hashes)
+        self._pending_rows += len(hashes)
+        if self._pending_rows >= self.compact_rows:
+            self._compact()
+
+    def _compact(self):
+        hashes = np.concatenate([self._unique_hashes, *self._pending_hashes])
+        self._unique_hashes = np.unique(hashes)
+        self._duplicates += len(hashes) - len(self._unique_hashes)
+        self._pending_hashes = []
+        self._pending_rows = 0
+
+    def merge(self, other):
+        self.row_count += other.row_count
+        for name, nulls in other.null_counts.items():
+            self.null_counts[name] = self.null_counts.get(name, 0) + nulls
+        for name, min_max in other.min_max.items():
+            self.min_max[name] = self._merge_min_max(self.min_max.get(name), min_max)
+        self._duplicates += other._duplicates
+        for hashes in (other._unique_hashes, *other._pending_hashes):
+            self._add_hashes(hashes)
+        return self
+
+    @property
+    def duplicate_count(self):
+        if self._pending_hashes:
+            self._compact()
+        return int(self._duplicates)
+
+
+class StreamingDataQualityLibrary:
+    @staticmethod
+    def profile(batches, key_columns=None):
+        return StreamingProfile.from_batches(batches, key_columns=key_columns)
+
+    @staticmethod
+    def check_dataset_is_not_empty(profile):
+        assert profile.row_count > 0, "Data set is empty"
+
+    @staticmethod
+    def check_count(profile1, profile2):
+        assert profile1.row_count == profile2.row_count, \
+            f"Row count mismatch: {profile1.row_count} != {profile2.row_count}"
+
+    @staticmethod
+    def check_duplicates(profile):
+        assert profile.duplicate_count == 0, \
+            f"Found {profile.duplicate_count} duplicate rows in columns: {profile.key_columns or 'all columns'}"
+
+    @staticmethod
+    def check_not_null_values(profile, column_names=None):
+        for col in column_names or profile.null_counts:
+            assert profile.null_counts[col] == 0, f"Null values found in column: {col} ({profile.null_counts[col]} rows)"
+
+    @staticmethod
+    def check_value_range(profile, column_ranges):
+        for col, (low, high) in column_ranges.items():
+            min_value, max_value = profile.min_max.get(col, (None, None))
+            assert low is None or min_value is None or min_value >= low, \
+                f"Values below {low} found in column: {col} (min {min_value})"
+            assert high is None or max_value is None or max_value <= high, \
+                f"Values above {high} found in column: {col} (max {max_value})"
@@ -1,7 +1,10 @@
 import pytest
 from src.connectors.postgres.postgres_connector import PostgresConnectorContextManager
 from src.data_quality.data_quality_validation_library import DataQualityLibrary
+from src.data_quality.sql_data_quality_library import SqlDataQualityLibrary
+from src.data_quality.streaming_checks import StreamingDataQualityLibrary
 from src.connectors.file_system.parquet_reader import ParquetReader
+from src.connectors.data_cache import DataCache
 
 
 def pytest_addoption(parser):
@@ -10,6 +13,53 @@ def pytest_addoption(parser):
     parser.addoption("--db_name", action="store", default="mydatabase", help="Database name")
     parser.addoption("--db_user", action="store", help="Database username")
     parser.addoption("--db_password", action="store", help="Database password")
+    parser.addoption("--db_fetch_mode", action="store", default="chunked", choices=["chunked", "copy"],
+                     help="How query results are transferred: chunked tuple fetches or COPY parsed by Arrow")
+    parser.addoption("--data_cache_memory_mb", action="store", default=1024,
+                     help="Memory budget of the parquet/SQL result cache, in MB")
+    parser.addoption("--data_cache_dir", action="store", default=None,
+                     help="Directory persisting the parquet/SQL result cache across runs (Arrow IPC)")
+    parser.addoption("--data_cache_disk_mb", action="store", default=4096,
+                     help="Disk budget of --data_cache_dir, in MB; the least recently used entries are removed")
+    parser.addoption("--no_data_cache", action="store_true", help="Disable the parquet/SQL result cache")
+
+
+MODULE_DURATIONS_CACHE_KEY = "dq/module_durations"
+module_durations = {}
+
+
+def module_of(nodeid):
+    return nodeid.split("::")[0]
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    Keeps every test module on one xdist worker (--dist loadgroup), so its module-scoped datasets are
+    loaded once, and schedules the slowest modules of the previous run first.
+    """
+    durations = config.cache.get(MODULE_DURATIONS_CACHE_KEY, {}) if getattr(config, "cache", None) else {}
+    for item in items:
+        item.add_marker(pytest.mark.xdist_group(name=module_of(item.nodeid)))
+    modules = list(dict.fromkeys(module_of(item.nodeid) for item in items))
+    # modules without a recorded duration go first, as they may be the heavy ones
+    order = sorted(modules, key=lambda module: (-durations.get(module, float("inf")), module))
+    position = {module: index for index, module in enumerate(order)}
+    items.sort(key=lambda item: position[module_of(item.nodeid)])
+
+
+def pytest_runtest_logreport(report):
+    module = module_of(report.nodeid)
+    module_durations[module] = module_durations.get(module, 0.0) + report.duration
+
+
+def pytest_sessionfinish(session):
+    # on the xdist controller (or a serial run), where the reports of every worker arrive
+    if hasattr(session.config, "workerinput") or not getattr(session.config, "cache", None):
+        return
+    durations = session.config.cache.get(MODULE_DURATIONS_CACHE_KEY, {})
+    durations.update({module: round(duration, 3) for module, duration in module_durations.items()})
+    session.config.cache.set(MODULE_DURATIONS_CACHE_KEY, durations)
 
 
 # def pytest_configure(config):
@@ -23,7 +73,19 @@ def pytest_addoption(parser):
 
 
 @pytest.fixture(scope='session')
-def db_connection(request):
+def data_cache(request):
+    cache = None
+    if not request.config.getoption("--no_data_cache"):
+        cache = DataCache(
+            memory_budget_mb=int(request.config.getoption("--data_cache_memory_mb")),
+            cache_dir=request.config.getoption("--data_cache_dir"),
+            disk_budget_mb=int(request.config.getoption("--data_cache_disk_mb"))
+        )
+    yield cache
+
+
+@pytest.fixture(scope='session')
+def db_connection(request, data_cache):
     db_host = request.config.getoption("--db_host")
     db_port = int(request.config.getoption("--db_port"))
     db_name = request.config.getoption("--db_name")
@@ -36,15 +98,17 @@ def db_connection(request):
             db_name=db_name,
             db_user=db_user,
             db_password=db_password,
-            db_port=db_port
+            db_port=db_port,
+            cache=data_cache,
+            fetch_mode=request.config.getoption("--db_fetch_mode")
         ) as db_connector:
             yield db_connector
     except Exception as e:
         pytest.fail(f"Failed to initialize PostgresConnectorContextManager: {e}")
 
 @pytest.fixture(scope='session')
-def parquet_reader():
-    reader = ParquetReader()
+def parquet_reader(data_cache):
+    reader = ParquetReader(cache=data_cache)
     yield reader
 
 @pytest.fixture(scope='session')
@@ -52,6 +116,16 @@ def data_quality_library():
     dql = DataQualityLibrary()
     yield dql
 
+@pytest.fixture(scope='session')
+def sql_data_quality_library(db_connection):
+    sql_dql = SqlDataQualityLibrary(db_connection)
+    yield sql_dql
+
+@pytest.fixture(scope='session')
+def streaming_data_quality_library():
+    streaming_dql = StreamingDataQualityLibrary()
+    yield streaming_dql
+
 # import pytest
 # from src.connectors.postgres.postgres_connector import PostgresConnectorContextManager
 # from src.data_quality.data_quality_validation_library import DataQualityLibrary
@@ -7,9 +7,7 @@ Author(s): Name Surname
 import pytest
 import os
 
-@pytest.fixture(scope='module')
-def target_data(db_connection):
-    target_query = """
+TARGET_QUERY = """
     with cte as (SELECT
     f.facility_type,
     CONCAT(p.first_name, ' ', p.last_name) AS full_name,
@@ -26,11 +24,15 @@ GROUP BY
 select *,facility_type AS facility_type_partition from cte
 
     """
-    target_data = db_connection.get_data_sql(target_query)
+
+
+@pytest.fixture(scope='module')
+def target_data(db_connection):
+    target_data = db_connection.get_data_sql(TARGET_QUERY)
     return target_data
 
 @pytest.fixture(scope='module')
-def source_data(parquet_reader):
+def source_path():
     root_path = os.getenv(
         "PARQUET_ROOT_PATH",
         "C:\\Users\\Orest_Malanchuk\\Documents\\D\\DQEA_course_OM_attempt2\\PyTest_DQ_Framework\\parquet_data"  # local default
@@ -38,7 +40,11 @@ def source_data(parquet_reader):
 
     # Subfolder specific to this check
     subfolder = "patient_sum_treatment_cost_per_facility_type"
-    source_path = os.path.join(root_path, subfolder)
+    return os.path.join(root_path, subfolder)
+
+
+@pytest.fixture(scope='module')
+def source_data(parquet_reader, source_path):
     source_data = parquet_reader.read_parquet(source_path)
     return source_data
 
@@ -56,12 +62,21 @@ def test_check_not_null_values(source_data, data_quality_library):
     data_quality_library.check_not_null_values(source_data,column_names=columns_to_check)
 
 @pytest.mark.source_to_target
-def test_check_count(source_data, target_data, data_quality_library):
-    data_quality_library.check_count(source_data, target_data)
+def test_check_target_not_null_values(sql_data_quality_library):
+    sql_data_quality_library.check_not_null_values(TARGET_QUERY, column_names=["facility_type", "full_name", "sum_treatment_cost"])
+
+@pytest.mark.source_to_target
+def test_check_count(source_data, sql_data_quality_library):
+    sql_data_quality_library.check_count(source_data, TARGET_QUERY)
 
 @pytest.mark.source_to_target
 def test_check_data_full_data_set(source_data, target_data, data_quality_library):
-    data_quality_library.check_data_full_data_set(source_data, target_data)
+    data_quality_library.check_data_full_data_set(source_data, target_data, key_columns=["facility_type", "full_name"])
+
+@pytest.mark.source_to_target
+def test_check_partitions_match(source_path, sql_data_quality_library):
+    sql_data_quality_library.check_partitions_match(source_path, TARGET_QUERY, partition_column="facility_type_partition",
+                                                    key_columns=["facility_type", "full_name"])
 
 @pytest.mark.validity
 def test_check_column_validity(source_data, data_quality_library):
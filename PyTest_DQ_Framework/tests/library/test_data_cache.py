@@ -0,0 +1,41 @@
+import os
+import time
+from uuid import uuid4
+
+import numpy as np
+import pyarrow as pa
+
+from src.connectors.data_cache import DataCache
+
+
+def test_sql_key_keeps_whitespace_inside_literals():
+    assert DataCache.sql_key("SELECT 'a  b'") != DataCache.sql_key("SELECT 'a b'")
+    assert DataCache.sql_key("  SELECT 1;\n") == DataCache.sql_key("SELECT 1")
+
+
+def test_cached_query_sees_rows_written_since_the_last_read(db_connection):
+    table = f'dq_cache_test_{uuid4().hex}'
+    query = f'SELECT COUNT(*) AS row_count FROM {table}'
+    try:
+        with db_connection.conn.cursor() as cur:
+            cur.execute(f'CREATE TABLE {table} (id int)')
+            cur.execute(f'INSERT INTO {table} VALUES (1)')
+        assert db_connection.get_data_sql(query)['row_count'].iloc[0] == 1
+
+        with db_connection.conn.cursor() as cur:
+            cur.execute(f'INSERT INTO {table} VALUES (2)')
+        assert db_connection.get_data_sql(query)['row_count'].iloc[0] == 2
+    finally:
+        db_connection.conn.rollback()
+
+
+def test_disk_cache_removes_least_recently_used_entries(tmp_path):
+    table = pa.table({'value': np.arange(100_000, dtype=np.int64)})  # ~0.8 MB on disk
+    cache = DataCache(memory_budget_mb=0, cache_dir=str(tmp_path), disk_budget_mb=2)
+    for version in range(4):
+        cache.put(DataCache.sql_key('SELECT 1', fingerprint=version), table)
+        time.sleep(0.01)
+
+    assert len(os.listdir(tmp_path)) == 2
+    assert cache.get(DataCache.sql_key('SELECT 1', fingerprint=0)) is None
+    assert cache.get(DataCache.sql_key('SELECT 1', fingerprint=3)) is not None
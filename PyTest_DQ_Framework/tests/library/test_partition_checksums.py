@@ -0,0 +1,54 @@
+import datetime
+import decimal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.data_quality.partition_checksums import PartitionChecksums
+
+# the rows of the parquet fixture as a Postgres query, and the row text Postgres renders for each of them
+SQL_QUERY = """
+SELECT * FROM (VALUES
+    ('Clinic', TIMESTAMP '2024-01-15 08:30:05.75', DATE '2024-01-15', 12.5::float8, 1050.25::numeric(10, 2), 3, '2024-01'),
+    (NULL, TIMESTAMP '2024-01-31 23:59:59.999', DATE '2024-01-31', 0.0::float8, NULL::numeric(10, 2), NULL, '2024-01'),
+    ('Urgent Care', NULL, NULL, NULL::float8, 7.1::numeric(10, 2), 42, '2024-02')
+) AS t(facility_type, visit_timestamp, visit_date, avg_time_spent, treatment_cost, visits, partition_date)
+"""
+SQL_ROW_TEXTS = [
+    'Clinic|2024-01-15 08:30:05|2024-01-15|1250|105025|300',
+    '\\N|2024-01-31 23:59:59|2024-01-31|0|\\N|\\N',
+    'Urgent Care|\\N|\\N|\\N|710|4200',
+]
+
+
+@pytest.fixture
+def parquet_path(tmp_path):
+    table = pa.table({
+        'facility_type': pa.array(['Clinic', None, 'Urgent Care']),
+        'visit_timestamp': pa.array([datetime.datetime(2024, 1, 15, 8, 30, 5, 750000),
+                                     datetime.datetime(2024, 1, 31, 23, 59, 59, 999000), None],
+                                    type=pa.timestamp('ns')),
+        'visit_date': pa.array([datetime.date(2024, 1, 15), datetime.date(2024, 1, 31), None]),
+        'avg_time_spent': pa.array([12.5, 0.0, None]),
+        'treatment_cost': pa.array([decimal.Decimal('1050.25'), None, decimal.Decimal('7.10')],
+                                   type=pa.decimal128(10, 2)),
+        'visits': pa.array([3, None, 42], type=pa.int64()),
+        'partition_date': pa.array(['2024-01', '2024-01', '2024-02']),
+    })
+    pq.write_to_dataset(table, root_path=str(tmp_path), partition_cols=['partition_date'])
+    return str(tmp_path)
+
+
+def test_arrow_row_texts_match_sql_row_texts(parquet_path):
+    checksums = PartitionChecksums(parquet_path, 'partition_date')
+    texts = [text for batch in checksums.dataset.to_batches(columns=checksums.columns)
+             for text in checksums.row_texts(batch).to_pylist()]
+    assert sorted(texts) == sorted(SQL_ROW_TEXTS)
+
+
+def test_parquet_checksums_match_sql_checksums(parquet_path, db_connection):
+    checksums = PartitionChecksums(parquet_path, 'partition_date')
+    mismatched = checksums.mismatched_partitions(checksums.parquet_checksums(),
+                                                 checksums.sql_checksums(db_connection, SQL_QUERY))
+    assert mismatched.empty, f"Mismatched partitions:\n{mismatched}"
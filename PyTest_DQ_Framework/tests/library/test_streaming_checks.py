@@ -0,0 +1,42 @@
+import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.data_quality.data_quality_validation_library import DataQualityLibrary
+from src.data_quality.streaming_checks import StreamingProfile
+
+# batches of one data set whose key column is typed differently from batch to batch
+BATCHES = {
+    'int then float with nulls': [
+        pa.table({'k': pa.array([1], type=pa.int64())}),
+        pa.table({'k': pa.array([1.0, None], type=pa.float64())}),
+    ],
+    'int with and without nulls': [
+        pa.table({'k': pa.array([1, 2], type=pa.int64())}),
+        pa.table({'k': pa.array([2, None], type=pa.int64())}),
+        pa.table({'k': pa.array([None, 3], type=pa.int32())}),
+    ],
+    'all-null batch': [
+        pa.table({'k': pa.array(['a', None])}),
+        pa.table({'k': pa.nulls(2)}),
+    ],
+    'dictionary and plain strings': [
+        pa.table({'k': pa.array(['a', 'b']).dictionary_encode()}),
+        pa.table({'k': pa.array(['b', 'c'], type=pa.large_string())}),
+    ],
+    'timestamp units': [
+        pa.table({'k': pa.array([datetime.datetime(2024, 1, 1, 8)], type=pa.timestamp('us'))}),
+        pa.table({'k': pa.array([datetime.datetime(2024, 1, 1, 8)], type=pa.timestamp('ns'))}),
+    ],
+}
+
+
+@pytest.mark.parametrize('name', BATCHES)
+def test_streaming_duplicate_count_matches_data_quality_library(name):
+    batches = BATCHES[name]
+    df = pd.concat([batch.to_pandas() for batch in batches], ignore_index=True)
+    expected = DataQualityLibrary.profile(df).duplicate_count(['k'])
+
+    assert StreamingProfile.from_batches(batches, key_columns=['k']).duplicate_count == expected
@@ -1,105 +1,126 @@
+import base64
+import json
+import re
+
+import numpy as np
 import pandas as pd
 import os
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    from webdriver_pool import get_pool
+except ImportError:  # selenium is only needed for the 'selenium' extraction mode
+    webdriver = None
 from IPython.display import display
 
 from pandas import to_datetime
 
-class WebDriverManager:
-    """A context manager for initializing and quitting the Selenium WebDriver."""
 
-    def __init__(self, driver_type='Chrome'):
-        self.driver = None
-        self.driver_type = driver_type
+PLOTLY_NEW_PLOT = re.compile(r'Plotly\.newPlot\(\s*"[^"]*",\s*')
+
+# plotly.js typed array codes used by the "bdata" encoding of numpy arrays
+PLOTLY_DTYPES = {'i1': 'int8', 'u1': 'uint8', 'i2': 'int16', 'u2': 'uint16', 'i4': 'int32', 'u4': 'uint32',
+                 'f4': 'float32', 'f8': 'float64'}
+
+# Collects the text of every table cell in one WebDriver round trip instead of one per cell.
+READ_TABLE_CELLS_SCRIPT = """
+return Array.from(document.querySelectorAll('.table .y-column')).map(function (column, index) {
+    var header = column.querySelector('#header');
+    var cells = Array.from(column.querySelectorAll('g.column-block:not(#header) .column-cells .column-cell'));
+    return {
+        header: header ? header.textContent.trim() : 'Column_' + (index + 1),
+        cells: cells.map(function (cell) { return cell.textContent.trim(); })
+    };
+});
+"""
+
+
+def decode_plotly_values(values):
+    """Decodes a plotly figure JSON value, expanding base64 "bdata" typed arrays into lists."""
+    if isinstance(values, dict) and 'bdata' in values:
+        array = np.frombuffer(base64.b64decode(values['bdata']), dtype=PLOTLY_DTYPES[values['dtype']])
+        if 'shape' in values:
+            array = array.reshape([int(dim) for dim in str(values['shape']).split(',')])
+        return array.tolist()
+    if isinstance(values, list):
+        return [decode_plotly_values(value) for value in values]
+    return values
+
+
+def read_plotly_traces(html_file_path: str) -> list:
+    """
+    Returns the traces of the plotly figure embedded in an HTML report (pio.write_html output)
+    by parsing the Plotly.newPlot(...) call, without a browser.
+    """
+    with open(html_file_path, encoding='utf-8') as html_file:
+        html = html_file.read()
+    match = PLOTLY_NEW_PLOT.search(html)
+    if match is None:
+        raise ValueError(f"No plotly figure found in {html_file_path}")
+    traces, _ = json.JSONDecoder().raw_decode(html, match.end())
+    return traces
+
+
+def read_table_cells_json(html_file_path: str) -> dict:
+    table = next((trace for trace in read_plotly_traces(html_file_path) if trace.get('type') == 'table'), None)
+    if table is None:
+        raise ValueError(f"No table trace found in {html_file_path}")
+    headers = decode_plotly_values(table['header']['values'])
+    columns = decode_plotly_values(table['cells']['values'])
+    return {str(header[0] if isinstance(header, list) else header): column for header, column in zip(headers, columns)}
+
+
+def read_table_cells_selenium(html_file_path: str) -> dict:
+    if webdriver is None:
+        raise ImportError("selenium is required for the 'selenium' extraction mode")
+    with get_pool().session() as driver:
+        driver.get('file://' + os.path.abspath(html_file_path))
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "table")))
+        return {column['header']: column['cells'] for column in driver.execute_script(READ_TABLE_CELLS_SCRIPT)}
+
+
+def close_webdriver_pool():
+    """Quits the pooled browser sessions (also done at interpreter exit)."""
+    if webdriver is not None:
+        get_pool().close()
 
-    def __enter__(self):
-        """Initializes the WebDriver."""
-        try:
-            if self.driver_type == 'Chrome':
-                self.driver = webdriver.Chrome()
-            else:
-                raise ValueError("Unsupported driver type")
 
-            return self.driver
-        except Exception as e:
-            print(f"Error initializing WebDriver: {e}")
-            raise
+def read_html_table(html_file_path: str, mode='json') -> pd.DataFrame:
+    """
+    Extracts the whole report table from a local HTML file.
+
+    mode='json' (default) parses the plotly figure JSON embedded in the report, with no browser;
+    mode='selenium' renders the report in Chrome and reads the cell text in a single script call.
+    """
+    if mode == 'json':
+        data = read_table_cells_json(html_file_path)
+    elif mode == 'selenium':
+        data = read_table_cells_selenium(html_file_path)
+    else:
+        raise ValueError(f"Unsupported extraction mode: {mode}")
+
+    table_result = pd.DataFrame({k: pd.Series(v) for k, v in data.items()})
+    table_result.sort_values(by='Facility Type', ascending=True, inplace=True)
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Quits the WebDriver to ensure proper cleanup."""
-        if self.driver:
-            self.driver.quit()
-        return False
+    table_result['Average Time Spent'] = pd.to_numeric(table_result['Average Time Spent'], errors='coerce')
+    # Fill any NaNs that might have been created during conversion
+    table_result['Average Time Spent'] = table_result['Average Time Spent'].fillna(0)  # or another default
+    # Round like the Parquet side, then convert the column to the required integer type (int64)
+    table_result['Average Time Spent'] = table_result['Average Time Spent'].round(0).astype('int64')
 
+    columns_to_select = ['Facility Type', 'Visit Date', 'Average Time Spent']
+    return table_result[columns_to_select]
 
-def read_html_table_to_dataframe(html_file_path: str, filter_date) -> pd.DataFrame:
+
+def read_html_table_to_dataframe(html_file_path: str, filter_date, mode='json') -> pd.DataFrame:
     """
-    Extracts a table from a local HTML file and saves its content to a CSV file.
+    Extracts the report table from a local HTML file, filtered by visit date.
     """
-    with WebDriverManager(driver_type='Chrome') as driver:
-        try:
-            full_html_path = 'file://' + os.path.abspath(html_file_path)
-            driver.get(full_html_path)
-
-            # 1. Wait for the table to be present using its table name.
-            wait = WebDriverWait(driver, 10)
-            table = wait.until(EC.presence_of_element_located((By.CLASS_NAME, "table")))
-            print("Table found successfully using its tag name.")
-
-            # 2. Read all data rows.
-            data = {}
-            columns = table.find_elements(By.CLASS_NAME, "y-column")
-
-            for col_index, column in enumerate(columns):
-                header_block = column.find_element( By.ID, "header")
-                header_text = header_block.text.strip() if header_block else f"Column_{col_index + 1}"
-
-                column_cells = []
-                column_blocks = column.find_elements(By.CSS_SELECTOR, "g.column-block")
-                for block in column_blocks:
-                    if block.get_attribute("id") == "header":
-                        continue
-                    cells_container = block.find_element( By.CLASS_NAME, "column-cells")
-                    if cells_container:
-                        cells = cells_container.find_elements(By.CLASS_NAME, "column-cell")
-                        for cell in cells:
-                            column_cells.append(cell.text.strip())
-
-                data[header_text] = column_cells
-
-            # 3. Write the extracted headers and data to a CSV file.
-            table_result = pd.DataFrame({k: pd.Series(v) for k, v in data.items()})
-            table_result.sort_values(by='Facility Type', ascending=True, inplace=True)
-
-            table_result['Average Time Spent'] = pd.to_numeric(table_result['Average Time Spent'], errors='coerce')
-            # 2. Fill any NaNs that might have been created during conversion
-            table_result['Average Time Spent'] = table_result['Average Time Spent'].fillna(0)  # or another default
-            # 3. Convert the column to the required integer type (int64)
-            table_result['Average Time Spent'] = table_result['Average Time Spent'].astype('int64')
-
-            filtered_df = table_result[table_result['Visit Date'] == filter_date]
-            # table_result.to_csv("output_table/table.csv", index=False)
-
-            columns_to_select = ['Facility Type', 'Visit Date', 'Average Time Spent']
-            selected_columns_df = filtered_df[columns_to_select]
-
-            return selected_columns_df
-            print("Dataset created")
-
-            # print(f"Table content has been successfully saved to {csv_file_path}")
-
-        except TimeoutException:
-            print("Error: No table element was found on the page within 10 seconds.")
-        except NoSuchElementException:
-            print("Error: Could not find header or row elements within the table. Check the table structure.")
-        except FileNotFoundError:
-            print(f"Error: The file '{html_file_path}' was not found.")
-        except Exception as e:
-            print(f"An unexpected error occurred: {e}")
+    table_result = read_html_table(html_file_path, mode)
+    return table_result[table_result['Visit Date'] == filter_date]
 
 
 def read_parquet_to_dataframe(folder_path: str, filter_date) -> pd.DataFrame:
@@ -107,10 +128,26 @@ def read_parquet_to_dataframe(folder_path: str, filter_date) -> pd.DataFrame:
     Reads a partitioned Parquet dataset into a Pandas DataFrame.
     It can optionally filter the data by a date partition.
 
-    Note: This function assumes the dataset is partitioned by a column named 'date'
-    with string values in 'YYYY-MM-DD' format.
+    Note: This function assumes the dataset is partitioned by a column named 'partition_date'
+    with string values in 'YYYY-MM' format, and that filter_date is in 'YYYY-MM-DD' format.
+    """
+    return read_parquet_dates(folder_path, [filter_date] if filter_date else None)
+
+
+def read_parquet_dates(folder_path: str, dates=None) -> pd.DataFrame:
     """
-    filters = [('visit_date', '==', to_datetime(filter_date).normalize())] if filter_date else None
+    Reads the rows of the given visit dates ('YYYY-MM-DD') from a partitioned Parquet dataset
+    in a single scan (all rows when dates is None).
+
+    The dataset is partitioned by partition_date ('YYYY-MM'), so the months of the requested dates
+    are filtered too: only their directories are opened, and the visit_date filter then skips
+    row groups by their statistics.
+    """
+    filters = None
+    if dates:
+        visit_dates = [to_datetime(date).normalize() for date in dates]
+        filters = [('partition_date', 'in', sorted({visit_date.strftime('%Y-%m') for visit_date in visit_dates})),
+                   ('visit_date', 'in', visit_dates)]
     try:
         df = pd.read_parquet(folder_path, filters=filters)
         # After filtering, the partition column ('date') might be categorical.
@@ -122,7 +159,7 @@ def read_parquet_to_dataframe(folder_path: str, filter_date) -> pd.DataFrame:
 
         # Round AND convert to integer type
         df['avg_time_spent'] = df['avg_time_spent'].round(0).astype(int)
-        df.sort_values(by='facility_type', ascending=True, inplace=True)
+        df.sort_values(by=['facility_type', 'visit_date'], ascending=True, inplace=True)
         df['avg_time_spent'] = pd.to_numeric(df['avg_time_spent'], errors='coerce')
 
         # Fill any NaNs that might have been created during conversion
@@ -160,6 +197,39 @@ def compare_dataframes(df1, df2):
     except AssertionError as e:
         return False, f"DataFrames do not match:\n{e}"
 
+
+def compare_report_dates(html_file_path: str, parquet_folder_path: str, dates=None, start_date=None, end_date=None,
+                         mode='json') -> pd.DataFrame:
+    """
+    Compares the report table with the Parquet dataset for many visit dates at once: the report and the
+    dataset are each loaded once and joined on (facility_type, visit_date).
+
+    Dates default to every date shown in the report, optionally limited to [start_date, end_date]
+    ('YYYY-MM-DD'). Returns one row per date with the row counts of both sides, the number of rows
+    missing on either side or with a different average time spent, and a PASS/FAIL status.
+    """
+    html_df = read_html_table(html_file_path, mode)
+    html_df.columns = html_df.columns.str.lower().str.replace(' ', '_')
+    if dates is None:
+        dates = sorted(html_df['visit_date'].unique())
+    dates = [date for date in dates if (start_date is None or date >= start_date) and
+             (end_date is None or date <= end_date)]
+    html_df = html_df[html_df['visit_date'].isin(dates)]
+    parquet_df = read_parquet_dates(parquet_folder_path, dates)
+
+    merged = html_df.merge(parquet_df, on=['facility_type', 'visit_date'], how='outer',
+                           suffixes=('_html', '_parquet'), indicator=True)
+    merged['html_rows'] = merged['_merge'] != 'right_only'
+    merged['parquet_rows'] = merged['_merge'] != 'left_only'
+    merged['mismatched_rows'] = ~(merged['html_rows'] & merged['parquet_rows']) | \
+        (merged['average_time_spent_html'] != merged['average_time_spent_parquet'])
+
+    results = merged.groupby('visit_date')[['html_rows', 'parquet_rows', 'mismatched_rows']].sum()
+    results = results.reindex(dates, fill_value=0).astype('int64').rename_axis('visit_date').reset_index()
+    passed = (results['mismatched_rows'] == 0) & (results['html_rows'] > 0)
+    results['status'] = passed.map({True: 'PASS', False: 'FAIL'})
+    return results
+
 # df1 = read_parquet_to_dataframe('parquet_data/facility_type_avg_time_spent_per_visit_date', "2025-10-29")
 # display(df1)
 # df2 = read_html_table_to_dataframe('C:\\Users\\Orest_Malanchuk\\Documents\\D\\DQEA_course_OM_attempt2\\Robot_Framework\\source_report.html',  "2025-10-29")
@@ -0,0 +1,112 @@
+import atexit
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+
+
+class WebDriverPool:
+    """
+    A pool of warm (headless by default) WebDriver sessions shared by keywords, tests and scripts.
+
+    Sessions are health-checked before reuse and replaced when they no longer respond or after
+    max_uses acquisitions, so a leaking or crashed browser does not outlive a few extractions.
+    All sessions are quit by close(), which also runs at interpreter exit.
+    """
+
+    def __init__(self, size=1, max_uses=50, headless=True, driver_type='Chrome', window_size='1920,1080'):
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self.driver_type = driver_type
+        self.window_size = window_size
+        self._idle = []
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._available = threading.Semaphore(size)
+        atexit.register(self.close)
+
+    def _create_driver(self):
+        if self.driver_type != 'Chrome':
+            raise ValueError("Unsupported driver type")
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument('--headless=new')
+        options.add_argument(f'--window-size={self.window_size}')
+        return webdriver.Chrome(options=options)
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:  # a dead driver process fails in urllib3 (ConnectionError), not as a WebDriverException
+            return False
+
+    def _quit(self, driver):
+        self._uses.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self):
+        self._available.acquire()
+        try:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is not None and (self._uses[driver] >= self.max_uses or not self._is_healthy(driver)):
+                self._quit(driver)
+                driver = None
+            if driver is None:
+                driver = self._create_driver()
+                self._uses[driver] = 0
+            self._uses[driver] += 1
+            return driver
+        except Exception:
+            self._available.release()
+            raise
+
+    def release(self, driver, discard=False):
+        try:
+            if discard:
+                self._quit(driver)
+                return
+            try:
+                driver.get('about:blank')  # drops the page, so an idle session holds no report in memory
+            except Exception:
+                self._quit(driver)
+                return
+            with self._lock:
+                self._idle.append(driver)
+        finally:
+            self._available.release()
+
+    @contextmanager
+    def session(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, discard=not self._is_healthy(driver))
+            raise
+        self.release(driver)
+
+    def close(self):
+        with self._lock:
+            self._idle = []
+            drivers = list(self._uses)
+        for driver in drivers:
+            self._quit(driver)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_pool(**pool_options):
+    """Returns the pool shared by the whole process, created with pool_options on the first call."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = WebDriverPool(**pool_options)
+        return _shared_pool
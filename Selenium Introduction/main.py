@@ -1,15 +1,20 @@
-import subprocess
+from main_chart import capture_chart
+from main_table import extract_table_to_csv
 
-def run_script(script_name):
+HTML_REPORT_FILE = "../Robot_Framework/source_report.html"
+
+
+def run_script(name, func, *args):
+    # both scripts run in this interpreter and share one warm browser session from the pool
     try:
-        result = subprocess.run(['python', script_name], check=True)
-        print(f"Successfully ran {script_name}")
-    except subprocess.CalledProcessError as e:
-        print(f"Error running {script_name}: {e}")
+        func(*args)
+        print(f"Successfully ran {name}")
+    except Exception as e:
+        print(f"Error running {name}: {e}")
 
 if __name__ == "__main__":
-    run_script('main_table.py')
-    run_script('main_chart.py')
+    run_script('main_table.py', extract_table_to_csv, HTML_REPORT_FILE, "output_table/table.csv")
+    run_script('main_chart.py', capture_chart, HTML_REPORT_FILE)
 
 
-### JUST RUN main.py ###
\ No newline at end of file
+### JUST RUN main.py ###
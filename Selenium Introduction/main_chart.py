@@ -1,7 +1,54 @@
 import os
-import time
+import sys
 import pandas as pd
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# webdriver_pool.py lives in Robot_Framework, where helper.py (the Robot keyword library) imports it too;
+# this directory is not a package, so the sibling folder is put on sys.path to share one pool implementation.
+# The path is resolved from this file, so the import does not depend on the working directory.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Robot_Framework'))
+from webdriver_pool import get_pool
+
+# Counts plotly_afterplot events of the figure, so a legend click can be awaited by its render instead of a sleep.
+INSTALL_AFTERPLOT_COUNTER_SCRIPT = """
+var gd = document.querySelector('.js-plotly-plot');
+if (gd.__afterplotCount === undefined) {
+    gd.__afterplotCount = 0;
+    gd.on('plotly_afterplot', function () { gd.__afterplotCount += 1; });
+}
+return gd.__afterplotCount;
+"""
+READ_AFTERPLOT_COUNT_SCRIPT = "return document.querySelector('.js-plotly-plot').__afterplotCount;"
+
+# Hides the legend labels one by one, as successive legend clicks do, through Plotly.relayout; each relayout
+# promise resolves once the chart is redrawn, and the slice texts of every state are returned in one call.
+EXTRACT_LEGEND_STATES_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var gd = document.querySelector('.js-plotly-plot');
+var labels = Array.from(gd.querySelectorAll('.legend .traces .legendtext')).map(function (text) {
+    return text.textContent;
+});
+function readSlices() {
+    return Array.from(gd.querySelectorAll('g.slice')).map(function (slice) {
+        var tspans = slice.querySelectorAll('g.slicetext text tspan');
+        return tspans.length >= 2 ? {'Facility Type': tspans[0].textContent.trim(),
+                                     'Min Average Time Spent': tspans[1].textContent.trim()} : null;
+    }).filter(Boolean);
+}
+var states = [readSlices()];
+function hide(count) {
+    if (count > labels.length) {
+        Plotly.relayout(gd, {hiddenlabels: []}).then(function () { done({states: states}); });
+        return;
+    }
+    Plotly.relayout(gd, {hiddenlabels: labels.slice(0, count)}).then(function () {
+        states.push(readSlices());
+        hide(count + 1);
+    }).catch(function (error) { done({error: String(error)}); });
+}
+hide(1);
+"""
 
 output_dir = os.path.join(os.getcwd(), "output_chart")
 
@@ -45,7 +92,23 @@ def extract_chart_data(chart_element):
             })
     return pd.DataFrame(data)
 
-def interact_doughnut_chart_with_legend(driver, chart_selector='svg', legend_selector='legend', legend_item_class='traces', screenshot_dir='output_chart'):
+def extract_legend_states(driver, timeout=30):
+    """Returns the slice data of the initial chart and of every legend-toggle state, in one script call (no screenshots)."""
+    driver.set_script_timeout(timeout)
+    result = driver.execute_async_script(EXTRACT_LEGEND_STATES_SCRIPT)
+    if 'error' in result:
+        raise RuntimeError(f"Failed to toggle the legend: {result['error']}")
+    return [pd.DataFrame(state, columns=["Facility Type", "Min Average Time Spent"]) for state in result['states']]
+
+def interact_doughnut_chart_with_legend(driver, chart_selector='svg', legend_selector='legend', legend_item_class='traces', screenshot_dir='output_chart', mode='events'):
+    """
+    mode='events' (default) clicks each legend item, waits for the plotly_afterplot event of the redraw and
+    writes a screenshot and the data of every state (output_chart{N}.png/.csv);
+    mode='data_only' extracts the data of every legend state in one script call and writes only the initial
+    screenshot (output_chart0.png) - no per-state screenshots.
+    """
+    if mode not in ('events', 'data_only'):
+        raise ValueError(f"Unsupported mode: {mode}")
     screenshot_counter = 0
     chart = safe_find_element(driver, By.CSS_SELECTOR, chart_selector)
     if not chart:
@@ -54,6 +117,10 @@ def interact_doughnut_chart_with_legend(driver, chart_selector='svg', legend_sel
 
     # Initial screenshot and data
     safe_screenshot(driver, chart, f"{screenshot_dir}/output_chart{screenshot_counter}.png")
+    if mode == 'data_only':
+        for state_index, state in enumerate(extract_legend_states(driver)):
+            state.to_csv(f"{screenshot_dir}/output_chart{state_index}.csv", index=False)
+        return
     extract_chart_data(chart).to_csv(f"{screenshot_dir}/output_chart{screenshot_counter}.csv", index=False)
     screenshot_counter += 1
 
@@ -66,10 +133,14 @@ def interact_doughnut_chart_with_legend(driver, chart_selector='svg', legend_sel
     legend_items = legend.find_elements(By.CLASS_NAME, legend_item_class)
     print(f"Found {len(legend_items)} legend items")
 
+    afterplot_count = driver.execute_script(INSTALL_AFTERPLOT_COUNTER_SCRIPT)
     for legend_item in legend_items:
         try:
             legend_item.click()
-            time.sleep(1)  # Wait for chart to update
+            # Wait for the chart to be redrawn
+            WebDriverWait(driver, 10, poll_frequency=0.05).until(
+                lambda d: d.execute_script(READ_AFTERPLOT_COUNT_SCRIPT) > afterplot_count)
+            afterplot_count = driver.execute_script(READ_AFTERPLOT_COUNT_SCRIPT)
             chart = safe_find_element(driver, By.CSS_SELECTOR, chart_selector)
             safe_screenshot(driver, chart, f"{screenshot_dir}/output_chart{screenshot_counter}.png")
             extract_chart_data(chart).to_csv(f"{screenshot_dir}/output_chart{screenshot_counter}.csv", index=False)
@@ -77,12 +148,13 @@ def interact_doughnut_chart_with_legend(driver, chart_selector='svg', legend_sel
         except Exception as e:
             print(f"Failed to apply legend filter or capture chart: {e}")
 
-# Example usage:
+def capture_chart(html_file_path, mode='events'):
+    with get_pool().session() as driver:
+        driver.get('file://' + os.path.abspath(html_file_path))
+        interact_doughnut_chart_with_legend(driver, mode=mode)
+
 
-from selenium import webdriver
-driver = webdriver.Chrome()
-full_html_path = 'file://' + os.path.abspath("../Robot_Framework/source_report.html")
-driver.get(full_html_path)
-interact_doughnut_chart_with_legend(driver)
+if __name__ == "__main__":
+    capture_chart("../Robot_Framework/source_report.html")
 
 # JUST RUN main.py
\ No newline at end of file
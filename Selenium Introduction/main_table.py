@@ -1,12 +1,18 @@
 import csv
 import os
-from selenium import webdriver
+import sys
 import pandas as pd
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+# webdriver_pool.py lives in Robot_Framework, where helper.py (the Robot keyword library) imports it too;
+# this directory is not a package, so the sibling folder is put on sys.path to share one pool implementation.
+# The path is resolved from this file, so the import does not depend on the working directory.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Robot_Framework'))
+from webdriver_pool import get_pool
+
 output_dir = os.path.join(os.getcwd(), "output_table")
 
 if not os.path.exists(output_dir):
@@ -15,38 +21,11 @@ if not os.path.exists(output_dir):
 else:
     print(f"Folder already exists: {output_dir}")
 
-class WebDriverManager:
-    """A context manager for initializing and quitting the Selenium WebDriver."""
-
-    def __init__(self, driver_type='Chrome'):
-        self.driver = None
-        self.driver_type = driver_type
-
-    def __enter__(self):
-        """Initializes the WebDriver."""
-        try:
-            if self.driver_type == 'Chrome':
-                self.driver = webdriver.Chrome()
-            else:
-                raise ValueError("Unsupported driver type")
-
-            return self.driver
-        except Exception as e:
-            print(f"Error initializing WebDriver: {e}")
-            raise
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Quits the WebDriver to ensure proper cleanup."""
-        if self.driver:
-            self.driver.quit()
-        return False
-
-
 def extract_table_to_csv(html_file_path, csv_file_path):
     """
     Extracts a table from a local HTML file and saves its content to a CSV file.
     """
-    with WebDriverManager(driver_type='Chrome') as driver:
+    with get_pool().session() as driver:
         try:
             full_html_path = 'file://' + os.path.abspath(html_file_path)
             driver.get(full_html_path)
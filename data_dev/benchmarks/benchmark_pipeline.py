@@ -0,0 +1,389 @@
+"""
+End-to-end benchmark of the data_dev pipeline.
+
+Runs DataGenerator, GeneratedDataLoader, NF3Loader, LoadParquet and ReportGenerator against a throwaway
+database at one or more scales and writes the wall time, rows processed, throughput and peak RSS of every
+stage to a JSON results file. Two results files can be compared to catch regressions.
+
+Usage (from the repository root, with PYTHONPATH set to it):
+
+    python -m data_dev.benchmarks.benchmark_pipeline run --scales small medium --output results.json
+    python -m data_dev.benchmarks.benchmark_pipeline compare baseline.json results.json --threshold 0.1
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import multiprocessing
+from uuid import uuid4
+from datetime import datetime, timedelta
+from dataclasses import asdict
+from concurrent.futures import ProcessPoolExecutor
+
+import psycopg2
+from psycopg2 import sql
+
+from data_dev.config import (postgres_config, data_generator_config, load_config, parquet_storage_config,
+                             report_generator_config)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# scale name -> (number of patients, number of years of visits up to today)
+SCALES = {
+    'small': (30, 1),
+    'medium': (10_000, 10),
+    'large': (1_000_000, 30)
+}
+
+
+def create_database(name, maintenance_db):
+    """
+    Creates an empty database on the configured server.
+
+    Args:
+        name (str): The name of the database to create.
+        maintenance_db (str): The existing database to connect to while creating it.
+    """
+    conn = psycopg2.connect(host=postgres_config.host, port=postgres_config.port, database=maintenance_db,
+                            user=postgres_config.user, password=postgres_config.password)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL('CREATE DATABASE {}').format(sql.Identifier(name)))
+    finally:
+        conn.close()
+
+
+def drop_database(name, maintenance_db):
+    """
+    Drops a database created by create_database, terminating any connection left open to it.
+
+    Args:
+        name (str): The name of the database to drop.
+        maintenance_db (str): The existing database to connect to while dropping it.
+    """
+    conn = psycopg2.connect(host=postgres_config.host, port=postgres_config.port, database=maintenance_db,
+                            user=postgres_config.user, password=postgres_config.password)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL('DROP DATABASE IF EXISTS {} WITH (FORCE)').format(sql.Identifier(name)))
+    finally:
+        conn.close()
+
+
+def configure(num_patients, years, server, database, work_dir):
+    """
+    Points the shared config instances at the benchmark scale, the throwaway database and a temporary directory.
+
+    The pipeline classes read the config instances when they are created, so this must run before the stages.
+
+    Args:
+        num_patients (int): The number of patients to generate.
+        years (int): The number of years of visits to generate, ending today.
+        server (dict): The host, port, user and password of the Postgres server.
+        database (str): The name of the throwaway database.
+        work_dir (str): The temporary directory for the parquet files and the report.
+    """
+    today = datetime.now().date()
+    data_generator_config.num_patients = num_patients
+    data_generator_config.start_date = (today - timedelta(days=365 * years)).strftime(data_generator_config.date_format)
+    data_generator_config.end_date = today.strftime(data_generator_config.date_format)
+    load_config.date_scope = today.strftime('%Y-%m-%d')
+    for key, value in server.items():
+        setattr(postgres_config, key, value)
+    postgres_config.db = database
+
+    parquet_dir = os.path.join(work_dir, 'parquet_data')
+    parquet_storage_config.storage_path_facility_type_avg_time_spent_per_visit_date = \
+        os.path.join(parquet_dir, 'facility_type_avg_time_spent_per_visit_date')
+    parquet_storage_config.storage_path_patient_sum_treatment_cost_per_facility_type = \
+        os.path.join(parquet_dir, 'patient_sum_treatment_cost_per_facility_type')
+    parquet_storage_config.storage_path_facility_name_min_time_spent_per_visit_date = \
+        os.path.join(parquet_dir, 'facility_name_min_time_spent_per_visit_date')
+    report_generator_config.storage_path = os.path.join(work_dir, 'generated_report')
+    report_generator_config.parquet_files_path = \
+        parquet_storage_config.storage_path_facility_type_avg_time_spent_per_visit_date
+
+
+def build_stages(connection_object, pool):
+    """
+    Declares the benchmarked stages: the same steps as main.py, preceded by data generation alone.
+
+    Args:
+        connection_object (PostgresConnectorContextManager): The connector used by the sequential stages.
+        pool (PostgresConnectionPool): The connection pool used by the parquet transforms.
+
+    Returns:
+        list: The stages of the benchmark.
+    """
+    from data_dev.src.data.data_generator import DataGenerator
+    from data_dev.src.data.inject_generated_data_to_src import GeneratedDataLoader
+    from data_dev.src.data.nf3_loader import NF3Loader
+    from data_dev.src.data.parquet_loader import LoadParquet
+    from data_dev.src.reporting.report_generator import ReportGenerator
+    from data_dev.src.pipeline.scheduler import Stage
+
+    def generate():
+        dg = DataGenerator()
+        dg.generate_reference_data()
+        return len(dg.get_facilities()) + len(dg.get_patients()) + sum(len(chunk) for chunk in dg.iter_visit_chunks())
+
+    def export(name):
+        return lambda: LoadParquet.export_dataset_from_pool(pool, name)[0]
+
+    return [
+        Stage('generate_data', generate),
+        Stage('generate_src_data',
+              lambda: GeneratedDataLoader(connection_object.get_connection()).inject_data(),
+              depends_on=['generate_data']),
+        Stage('load_3nf',
+              lambda: NF3Loader(connection_object.get_connection()).load_data(),
+              depends_on=['generate_src_data']),
+        Stage('prepare_parquet_export',
+              lambda: LoadParquet(connection_object).prepare_export(),
+              depends_on=['load_3nf']),
+        Stage('facility_type_avg_time_spent_per_visit_date',
+              export('facility_type_avg_time_spent_per_visit_date'),
+              depends_on=['prepare_parquet_export']),
+        Stage('patient_sum_treatment_cost_per_facility_type',
+              export('patient_sum_treatment_cost_per_facility_type'),
+              depends_on=['prepare_parquet_export']),
+        Stage('facility_name_min_time_spent_per_visit_date',
+              export('facility_name_min_time_spent_per_visit_date'),
+              depends_on=['prepare_parquet_export']),
+        Stage('generate_report',
+              lambda: ReportGenerator().generate_report(),
+              depends_on=['facility_type_avg_time_spent_per_visit_date'])
+    ]
+
+
+def run_scale(num_patients, years, max_workers, server, maintenance_db):
+    """
+    Runs the whole pipeline once at a given scale against a fresh throwaway database.
+
+    It is meant to run in a fresh process, so the peak RSS of a run is not inflated by earlier runs.
+
+    Args:
+        num_patients (int): The number of patients to generate.
+        years (int): The number of years of visits to generate, ending today.
+        max_workers (int): The maximum number of independent stages running at the same time.
+        server (dict): The host, port, user and password of the Postgres server.
+        maintenance_db (str): The existing database used to create and drop the throwaway database.
+
+    Returns:
+        dict: The wall time of the run and the StageResult of every stage, as dictionaries.
+    """
+    from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager, PostgresConnectionPool
+    from data_dev.src.pipeline.scheduler import PipelineScheduler
+
+    database = f"dqe_benchmark_{uuid4().hex[:12]}"
+    work_dir = tempfile.mkdtemp(prefix='dqe_benchmark_')
+    configure(num_patients, years, server, database, work_dir)
+    create_database(database, maintenance_db)
+    try:
+        start = time.perf_counter()
+        with PostgresConnectorContextManager() as connection_object, \
+                PostgresConnectionPool(maxconn=max_workers) as pool:
+            results = PipelineScheduler(build_stages(connection_object, pool), max_workers=max_workers).run()
+        wall_time = time.perf_counter() - start
+    finally:
+        drop_database(database, maintenance_db)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    PipelineScheduler.log_report(results)
+    return {'wall_time_s': round(wall_time, 3), 'stages': [asdict(result) for result in results]}
+
+
+def summarize(runs):
+    """
+    Reduces the repeated runs of a scale to the median wall time, rows and throughput of every stage.
+
+    Args:
+        runs (list): The results of run_scale for the repeated runs of a scale.
+
+    Returns:
+        dict: The summary of the scale, keyed by stage name, plus the raw runs.
+    """
+    stages = {}
+    for name in [stage['name'] for stage in runs[0]['stages']]:
+        measured = [stage for run in runs for stage in run['stages'] if stage['name'] == name]
+        succeeded = [stage for stage in measured if stage['status'] == 'success']
+        if not succeeded:
+            stages[name] = {'status': measured[-1]['status'], 'error': measured[-1]['error']}
+            continue
+        wall_time = statistics.median(stage['wall_time_s'] for stage in succeeded)
+        rows = succeeded[-1]['rows_processed']
+        stages[name] = {
+            'status': 'success' if len(succeeded) == len(measured) else 'partial',
+            'wall_time_s': round(wall_time, 3),
+            'rows_processed': rows,
+            'rows_per_s': round(rows / wall_time, 1) if rows and wall_time else None,
+            'process_peak_rss_mb': max(stage['process_peak_rss_mb'] or 0 for stage in succeeded) or None
+        }
+    return {
+        'wall_time_s': round(statistics.median(run['wall_time_s'] for run in runs), 3),
+        'stages': stages,
+        'runs': runs
+    }
+
+
+def git_commit():
+    """
+    Returns the commit of the benchmarked tree, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(args):
+    """
+    Runs the requested scales, each repeat in its own spawned process, and writes the results file.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments of the `run` command.
+
+    Returns:
+        int: The exit code; 1 if a stage failed in any run.
+    """
+    scales = {name: SCALES[name] for name in args.scales}
+    for num_patients in args.patients or []:
+        scales[f"{num_patients}_patients"] = (num_patients, args.years)
+
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'max_workers': args.max_workers,
+        'scales': {}
+    }
+    server = {'host': args.host, 'port': args.port, 'user': args.user, 'password': args.password}
+    context = multiprocessing.get_context('spawn')
+    for name, (num_patients, years) in scales.items():
+        runs = []
+        for repeat in range(args.repeat):
+            logging.info(f"Benchmarking scale {name} ({num_patients} patients, {years} years), "
+                         f"run {repeat + 1}/{args.repeat}")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                runs.append(executor.submit(run_scale, num_patients, years, args.max_workers, server,
+                                            args.maintenance_db).result())
+        results['scales'][name] = {'num_patients': num_patients, 'years': years, **summarize(runs)}
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as results_file:
+        json.dump(results, results_file, indent=2)
+    logging.info(f"Benchmark results written to {args.output}")
+
+    failed = [f"{scale}.{stage}" for scale, summary in results['scales'].items()
+              for stage, measured in summary['stages'].items() if measured['status'] != 'success']
+    if failed:
+        logging.error(f"Stages not succeeding in every run: {', '.join(failed)}")
+    return 1 if failed else 0
+
+
+def compare(args):
+    """
+    Compares the stage wall times of two results files and reports the regressions.
+
+    A stage regresses when its wall time grows by more than the threshold (relative) and by more
+    than the minimal delta (absolute, to ignore noise on stages taking milliseconds).
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments of the `compare` command.
+
+    Returns:
+        int: The exit code; 1 if any stage regressed or stopped succeeding.
+    """
+    with open(args.baseline) as baseline_file, open(args.candidate) as candidate_file:
+        baseline, candidate = json.load(baseline_file), json.load(candidate_file)
+
+    regressions = []
+    print(f"{'scale':<20} {'stage':<48} {'baseline_s':>11} {'candidate_s':>12} {'change':>8}")
+    for scale, summary in candidate['scales'].items():
+        if scale not in baseline['scales']:
+            continue
+        for stage, measured in summary['stages'].items():
+            reference = baseline['scales'][scale]['stages'].get(stage)
+            if reference is None or reference['status'] != 'success':
+                continue
+            if measured['status'] != 'success':
+                regressions.append(f"{scale}.{stage} ({measured['status']})")
+                print(f"{scale:<20} {stage:<48} {reference['wall_time_s']:>11.3f} {'-':>12} {measured['status']:>8}")
+                continue
+            delta = measured['wall_time_s'] - reference['wall_time_s']
+            change = delta / reference['wall_time_s'] if reference['wall_time_s'] else 0.0
+            flag = ''
+            if change > args.threshold and delta > args.min_delta:
+                regressions.append(f"{scale}.{stage} ({change:+.1%})")
+                flag = '  REGRESSION'
+            print(f"{scale:<20} {stage:<48} {reference['wall_time_s']:>11.3f} "
+                  f"{measured['wall_time_s']:>12.3f} {change:>+8.1%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print('\nNo regressions.')
+    return 0
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line arguments.
+
+    Args:
+        argv (list, optional): The arguments to parse, defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description='End-to-end benchmark of the data_dev pipeline.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the pipeline at one or more scales and record the results.')
+    run_parser.add_argument('--scales', nargs='*', choices=SCALES, default=['small'],
+                            help='Predefined scales to run (default: small).')
+    run_parser.add_argument('--patients', nargs='*', type=int,
+                            help='Additional custom scales, by number of patients.')
+    run_parser.add_argument('--years', type=int, default=1,
+                            help='Years of visits generated for the custom scales (default: 1).')
+    run_parser.add_argument('--repeat', type=int, default=1,
+                            help='Runs per scale; the median wall time is reported (default: 1).')
+    run_parser.add_argument('--max-workers', type=int, default=3,
+                            help='Maximum number of stages running at the same time (default: 3).')
+    run_parser.add_argument('--host', default=postgres_config.host)
+    run_parser.add_argument('--port', type=int, default=postgres_config.port)
+    run_parser.add_argument('--user', default=postgres_config.user)
+    run_parser.add_argument('--password', default=postgres_config.password)
+    run_parser.add_argument('--maintenance-db', default='postgres',
+                            help='Existing database used to create and drop the throwaway databases.')
+    run_parser.add_argument('--output', default='benchmark_results.json', help='Path of the results file.')
+
+    compare_parser = commands.add_parser('compare', help='Compare two results files.')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='Relative wall time increase reported as a regression (default: 0.1).')
+    compare_parser.add_argument('--min-delta', type=float, default=0.5,
+                                help='Minimal absolute increase in seconds reported as a regression (default: 0.5).')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'compare':
+        return compare(args)
+    return run_benchmark(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
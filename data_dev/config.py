@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 
@@ -34,6 +34,13 @@ class DataGeneratorConfig:
         date_format (str): The format of the date strings (e.g., '%Y-%m-%d').
         facility_types (List[str]): A list of facility types (e.g., "Hospital", "Clinic").
         visits_per_day (Tuple[int, int]): A tuple specifying the range (min, max) of visits per day.
+        engine (str): The visit generation engine: 'numpy' (vectorized, columnar) or 'python' (per-visit loop).
+        seed (Optional[int]): The random seed for reproducible output, or None for a random run.
+        chunk_months (Optional[int]): When set, visits are generated and loaded as a stream of chunks of
+                                      this many months, keeping memory flat regardless of the date range.
+                                      When None, all visits are generated at once.
+        workers (int): The number of worker processes generating patient and visit shards in parallel.
+                       With a seed, the output is the same whatever the number of workers.
     """
     num_patients: int
     start_date: str
@@ -41,6 +48,24 @@ class DataGeneratorConfig:
     date_format: str
     facility_types: List[str]
     visits_per_day: Tuple[int, int]
+    engine: str = 'numpy'
+    seed: Optional[int] = None
+    chunk_months: Optional[int] = None
+    workers: int = 1
+
+
+@dataclass
+class GeneratedDataLoaderConfig:
+    """
+    A dataclass to store configuration settings for loading generated data into the src layer.
+
+    Attributes:
+        load_mode (str): The ingestion path to use: 'copy' (COPY FROM STDIN with a fallback to
+                         batched inserts), 'batch' (batched multi-row inserts) or 'row' (one INSERT per row).
+        batch_size (int): The number of rows sent per statement in 'batch' mode.
+    """
+    load_mode: str
+    batch_size: int
 
 
 @dataclass
@@ -61,6 +86,28 @@ class ParquetStorageConfig:
     storage_path_facility_name_min_time_spent_per_visit_date: str
 
 
+@dataclass
+class ParquetExportConfig:
+    """
+    Configuration class for the export of the parquet datasets.
+
+    Attributes:
+        incremental (bool): If True, only the partitions touched by visits added since the previous export
+                            are re-aggregated and rewritten; per-partition export metadata is kept in
+                            the `parquet_export_metadata` table. If False, every dataset is rewritten in full.
+        streaming (bool): If True, query results are streamed from a server-side cursor as Arrow record batches
+                          and written incrementally, so memory is bounded by `batch_size` rows instead of
+                          by the size of the dataset. If False, each result is loaded into a DataFrame first.
+        batch_size (int): The number of rows fetched and written per batch in streaming mode.
+        workers (int): The number of datasets exported concurrently, each over its own pooled connection.
+                       With 1, the datasets are exported one after another over the main connection.
+    """
+    incremental: bool
+    streaming: bool
+    batch_size: int
+    workers: int
+
+
 @dataclass
 class LoadConfig:
     """
@@ -70,8 +117,11 @@ class LoadConfig:
         last_date (str): The last date for which data should be successfully loaded.
                          This is typically used to track the progress of incremental data loads.
                          The date should be in the format 'YYYY-MM-DD'.
+        load_mode (str): How the 3NF layer is loaded: 'full' merges the whole src layer on every run,
+                         'incremental' merges only src rows above the high-water mark of the previous run.
     """
     date_scope: str
+    load_mode: str = 'full'
 
 
 @dataclass
@@ -88,9 +138,23 @@ class ReportGeneratorConfig:
     parquet_files_path: str
 
 
+@dataclass
+class PipelineConfig:
+    """
+    PipelineConfig is a configuration class used to define settings for the pipeline run in main.py.
+
+    Attributes:
+        max_workers (int): The maximum number of independent stages running at the same time.
+        report_path (str): The path of the JSON timing report written after every run.
+    """
+    max_workers: int
+    report_path: str
+
+
 # Instance of LoadConfig
 load_config = LoadConfig(
-    date_scope=datetime.now().date().strftime('%Y-%m-%d')  # Example: '2025-01-01'
+    date_scope=datetime.now().date().strftime('%Y-%m-%d'),  # Example: '2025-01-01'
+    load_mode='incremental'  # full, incremental
 )
 
 # Instance of PostgresConfig
@@ -109,7 +173,17 @@ data_generator_config = DataGeneratorConfig(
     end_date='2030-01-01',
     date_format='%Y-%m-%d',
     facility_types=['Hospital', 'Clinic', 'Urgent Care', 'Specialty Center'],
-    visits_per_day=(7, 10)
+    visits_per_day=(7, 10),
+    engine='numpy',  # numpy, python
+    seed=None,
+    chunk_months=1,  # None to generate all visits at once
+    workers=1
+)
+
+# Instance of GeneratedDataLoaderConfig
+generated_data_loader_config = GeneratedDataLoaderConfig(
+    load_mode='copy',  # copy, batch, row
+    batch_size=1000
 )
 
 # Instance of ParquetStorageConfig
@@ -122,8 +196,22 @@ parquet_storage_config = ParquetStorageConfig(
                                                              'facility_name_min_time_spent_per_visit_date'
 )
 
+# Instance of ParquetExportConfig
+parquet_export_config = ParquetExportConfig(
+    incremental=True,
+    streaming=True,
+    batch_size=50000,
+    workers=3
+)
+
 # Instance of ReportGeneratorConfig
 report_generator_config = ReportGeneratorConfig(
     storage_path='/generated_report',
     parquet_files_path='/parquet_data/facility_type_avg_time_spent_per_visit_date'
 )
+
+# Instance of PipelineConfig
+pipeline_config = PipelineConfig(
+    max_workers=3,
+    report_path='/generated_report/pipeline_run_report.json'
+)
@@ -1,9 +1,13 @@
-from src.connectors.postgre_connector import PostgresConnectorContextManager
+from src.connectors.postgre_connector import PostgresConnectorContextManager, PostgresConnectionPool
 from src.data.inject_generated_data_to_src import GeneratedDataLoader
 from src.data.nf3_loader import NF3Loader
 from src.data.parquet_loader import LoadParquet
 from src.reporting.report_generator import ReportGenerator
+from src.pipeline.scheduler import Stage, PipelineScheduler
+from data_dev.config import pipeline_config
 
+import sys
+import time
 import logging
 import warnings
 
@@ -11,39 +15,60 @@ warnings.filterwarnings("ignore")
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
+def build_stages(connection_object, pool):
+    """
+    Declares the pipeline stages and their dependencies.
+
+    The parquet transforms only depend on the 3NF layer, so they run concurrently, each over its own
+    pooled connection; the report only waits for the dataset it reads.
+
+    Args:
+        connection_object (PostgresConnectorContextManager): The connector used by the sequential stages.
+        pool (PostgresConnectionPool): The connection pool used by the parquet transforms.
+
+    Returns:
+        list: The stages of the pipeline.
+    """
+    def export(name):
+        return lambda: LoadParquet.export_dataset_from_pool(pool, name)[0]
+
+    return [
+        Stage('generate_src_data',
+              lambda: GeneratedDataLoader(connection_object.get_connection()).inject_data()),
+        Stage('load_3nf',
+              lambda: NF3Loader(connection_object.get_connection()).load_data(),
+              depends_on=['generate_src_data']),
+        Stage('prepare_parquet_export',
+              lambda: LoadParquet(connection_object).prepare_export(),
+              depends_on=['load_3nf']),
+        Stage('facility_type_avg_time_spent_per_visit_date',
+              export('facility_type_avg_time_spent_per_visit_date'),
+              depends_on=['prepare_parquet_export']),
+        Stage('patient_sum_treatment_cost_per_facility_type',
+              export('patient_sum_treatment_cost_per_facility_type'),
+              depends_on=['prepare_parquet_export']),
+        Stage('facility_name_min_time_spent_per_visit_date',
+              export('facility_name_min_time_spent_per_visit_date'),
+              depends_on=['prepare_parquet_export']),
+        Stage('generate_report',
+              lambda: ReportGenerator().generate_report(),
+              depends_on=['facility_type_avg_time_spent_per_visit_date'])
+    ]
+
+
 def main():
-    with PostgresConnectorContextManager() as connection_object:
-        # generate and load generated data into src layer
-        try:
-            logging.info(f"Starting data generation and injection into Postgres...")
-            gdi = GeneratedDataLoader(connection_object.get_connection())
-            gdi.inject_data()
-            logging.info(f"Data generation and injection into Postgres Completed!")
-        except Exception as e:
-            logging.exception(f"Data generation and injection into Postgres FAILED: {e}")
-        # load to nf3 layer
-        try:
-            logging.info(f"Starting transformation of injected data...")
-            l3nf = NF3Loader(connection_object.get_connection())
-            l3nf.load_data()
-            logging.info(f"Transformation of injected data completed!")
-        except Exception as e:
-            logging.exception(f"Transformation of injected data FAILED: {e}")
-        # load parquet files
-        try:
-            logging.info(f"Starting transformation of parquet files...")
-            ld = LoadParquet(connection_object)
-            ld.load_parquet()
-            logging.info(f"Transformation of parquet files completed!")
-        except Exception as e:
-            logging.exception(f"Transformation of parquet files FAILED: {e}")
-        try:
-            logging.info(f"Starting report generation...")
-            rp = ReportGenerator()
-            rp.generate_report()
-            logging.info(f"Report generation completed!")
-        except Exception as e:
-            logging.exception(f"Report generation FAILED: {e}")
+    start = time.perf_counter()
+    with PostgresConnectorContextManager() as connection_object, \
+            PostgresConnectionPool(maxconn=pipeline_config.max_workers) as pool:
+        scheduler = PipelineScheduler(build_stages(connection_object, pool), max_workers=pipeline_config.max_workers)
+        results = scheduler.run()
+    wall_time = time.perf_counter() - start
+
+    PipelineScheduler.log_report(results)
+    PipelineScheduler.write_report(results, pipeline_config.report_path, wall_time)
+    logging.info(f"Pipeline finished in {wall_time:.2f}s, report written to {pipeline_config.report_path}")
+    if any(result.status != 'success' for result in results):
+        sys.exit(1)
 
 
 if __name__ == '__main__':
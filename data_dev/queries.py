@@ -47,6 +47,42 @@ INSERT INTO src_generated_visits (patient_id, facility_id, visit_timestamp, trea
 VALUES (%(patient_id)s, %(facility_id)s, %(visit_timestamp)s, %(treatment_cost)s, %(duration_minutes)s)
 """
 
+SRC_GENERATED_FACILITIES_COLUMNS = ('facility_id', 'facility_name', 'facility_type', 'address', 'city', 'state')
+
+SRC_GENERATED_PATIENTS_COLUMNS = ('patient_id', 'first_name', 'last_name', 'date_of_birth', 'address')
+
+SRC_GENERATED_VISITS_COLUMNS = ('patient_id', 'facility_id', 'visit_timestamp', 'treatment_cost', 'duration_minutes')
+
+COPY_SRC_GENERATED_FACILITIES_QUERY = """
+COPY src_generated_facilities (facility_id, facility_name, facility_type, address, city, state)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+COPY_SRC_GENERATED_PATIENTS_QUERY = """
+COPY src_generated_patients (patient_id, first_name, last_name, date_of_birth, address)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+COPY_SRC_GENERATED_VISITS_QUERY = """
+COPY src_generated_visits (patient_id, facility_id, visit_timestamp, treatment_cost, duration_minutes)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+BATCH_INSERT_SRC_GENERATED_FACILITIES_QUERY = """
+INSERT INTO src_generated_facilities (facility_id, facility_name, facility_type, address, city, state)
+VALUES %s
+"""
+
+BATCH_INSERT_SRC_GENERATED_PATIENTS_QUERY = """
+INSERT INTO src_generated_patients (patient_id, first_name, last_name, date_of_birth, address)
+VALUES %s
+"""
+
+BATCH_INSERT_SRC_GENERATED_VISITS_QUERY = """
+INSERT INTO src_generated_visits (patient_id, facility_id, visit_timestamp, treatment_cost, duration_minutes)
+VALUES %s
+"""
+
 # 3NF LAYER
 
 
@@ -135,6 +171,123 @@ WHEN NOT MATCHED THEN
     VALUES (source.facility_id, source.patient_id, source.visit_timestamp, source.treatment_cost, source.duration_minutes);
 """
 
+# INCREMENTAL 3NF LOAD
+
+
+CREATE_LOAD_WATERMARKS_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS load_watermarks (
+    source_table VARCHAR(100) PRIMARY KEY, -- Name of the source table
+    high_water_mark TEXT NOT NULL, -- Highest watermark column value merged so far
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW() -- Time of the last watermark update
+);
+"""
+
+CREATE_FACILITIES_EXTERNAL_ID_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS facilities_external_id_idx ON facilities (external_id);
+"""
+
+CREATE_PATIENTS_EXTERNAL_ID_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS patients_external_id_idx ON patients (external_id);
+"""
+
+CREATE_VISITS_NATURAL_KEY_UNIQUE_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS visits_natural_key_idx ON visits (facility_id, patient_id, visit_timestamp);
+"""
+
+CREATE_VISITS_NATURAL_KEY_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS visits_natural_key_idx ON visits (facility_id, patient_id, visit_timestamp);
+"""
+
+CREATE_SRC_GENERATED_VISITS_TIMESTAMP_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS src_generated_visits_visit_timestamp_idx ON src_generated_visits (visit_timestamp);
+"""
+
+GET_WATERMARK_QUERY = """
+SELECT high_water_mark FROM load_watermarks WHERE source_table = %(source_table)s;
+"""
+
+UPSERT_WATERMARK_QUERY = """
+INSERT INTO load_watermarks (source_table, high_water_mark, updated_at)
+VALUES (%(source_table)s, %(high_water_mark)s, NOW())
+ON CONFLICT (source_table) DO UPDATE
+SET high_water_mark = EXCLUDED.high_water_mark,
+    updated_at = EXCLUDED.updated_at;
+"""
+
+GET_SRC_GENERATED_FACILITIES_HIGH_WATER_MARK_QUERY = """
+SELECT MAX(facility_id) FROM src_generated_facilities;
+"""
+
+GET_SRC_GENERATED_PATIENTS_HIGH_WATER_MARK_QUERY = """
+SELECT MAX(patient_id) FROM src_generated_patients;
+"""
+
+GET_SRC_GENERATED_VISITS_HIGH_WATER_MARK_QUERY = """
+SELECT MAX(visit_timestamp) FROM src_generated_visits WHERE visit_timestamp < %(date_scope)s::date + 1;
+"""
+
+MERGE_FACILITIES_INCREMENTAL_QUERY = """
+WITH src_facilities AS (
+    SELECT * 
+    FROM public.src_generated_facilities
+    WHERE facility_id > %(low_water_mark)s
+        AND facility_id <= %(high_water_mark)s
+)
+MERGE INTO facilities AS target
+USING src_facilities AS source
+ON target.external_id = source.facility_id
+WHEN MATCHED THEN 
+    DO NOTHING
+WHEN NOT MATCHED THEN
+    INSERT (external_id, facility_name, facility_type, address, city, state)
+    VALUES (source.facility_id, source.facility_name, source.facility_type, source.address, source.city, source.state);
+"""
+
+MERGE_PATIENTS_INCREMENTAL_QUERY = """
+WITH src_patients AS (
+    SELECT * 
+    FROM public.src_generated_patients
+    WHERE patient_id > %(low_water_mark)s
+        AND patient_id <= %(high_water_mark)s
+)
+MERGE INTO patients AS target
+USING src_patients AS source
+ON target.external_id = source.patient_id
+WHEN MATCHED THEN 
+    DO NOTHING
+WHEN NOT MATCHED THEN
+    INSERT (external_id, first_name, last_name, date_of_birth, address)
+    VALUES (source.patient_id, source.first_name, source.last_name, source.date_of_birth, source.address);
+"""
+
+MERGE_VISITS_INCREMENTAL_QUERY = """
+WITH src_visits AS (
+    SELECT DISTINCT ON (f.id, p.id, sgv.visit_timestamp)
+        f.id AS facility_id,
+        p.id AS patient_id,
+        sgv.visit_timestamp,
+        sgv.treatment_cost,
+        sgv.duration_minutes 
+    FROM src_generated_visits sgv 
+    JOIN facilities f 
+        ON sgv.facility_id = f.external_id 
+    JOIN patients p
+        ON sgv.patient_id = p.external_id 
+    WHERE sgv.visit_timestamp > %(low_water_mark)s
+        AND sgv.visit_timestamp <= %(high_water_mark)s
+)
+MERGE INTO visits AS target
+USING src_visits AS source
+ON target.facility_id = source.facility_id
+   AND target.patient_id = source.patient_id
+   AND target.visit_timestamp = source.visit_timestamp
+WHEN MATCHED THEN
+    DO NOTHING
+WHEN NOT MATCHED THEN
+    INSERT (facility_id, patient_id, visit_timestamp, treatment_cost, duration_minutes)
+    VALUES (source.facility_id, source.patient_id, source.visit_timestamp, source.treatment_cost, source.duration_minutes);
+"""
+
 # PARQUET PREPARATION
 
 TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL = """
@@ -208,3 +361,60 @@ GROUP BY
     f.facility_name,
     visit_date;
 """
+
+# INCREMENTAL PARQUET EXPORT
+
+CREATE_PARQUET_EXPORT_METADATA_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS parquet_export_metadata (
+    dataset VARCHAR(100) NOT NULL, -- Name of the exported parquet dataset
+    partition_value VARCHAR(100) NOT NULL, -- Value of the partition column
+    row_count INT NOT NULL, -- Number of rows written to the partition
+    max_visit_id INT NOT NULL, -- Highest visits.id covered by the export
+    exported_at TIMESTAMP NOT NULL DEFAULT NOW(), -- Time of the last export of the partition
+    PRIMARY KEY (dataset, partition_value)
+);
+"""
+
+GET_LAST_EXPORTED_VISIT_ID_QUERY = """
+SELECT MAX(max_visit_id) FROM parquet_export_metadata WHERE dataset = %(dataset)s;
+"""
+
+GET_MAX_VISIT_ID_QUERY = """
+SELECT COALESCE(MAX(id), 0) FROM visits;
+"""
+
+UPSERT_PARQUET_EXPORT_METADATA_QUERY = """
+INSERT INTO parquet_export_metadata (dataset, partition_value, row_count, max_visit_id, exported_at)
+VALUES %s
+ON CONFLICT (dataset, partition_value) DO UPDATE
+SET row_count = EXCLUDED.row_count,
+    max_visit_id = EXCLUDED.max_visit_id,
+    exported_at = EXCLUDED.exported_at;
+"""
+
+GET_CHANGED_VISIT_MONTHS_QUERY = """
+SELECT DISTINCT TO_CHAR(v.visit_timestamp, 'YYYY-MM') AS partition_value
+FROM visits v
+WHERE v.id > %(last_visit_id)s;
+"""
+
+GET_CHANGED_FACILITY_TYPES_QUERY = """
+SELECT DISTINCT REPLACE(f.facility_type, ' ', '_') AS partition_value
+FROM visits v
+JOIN facilities f 
+    ON f.id = v.facility_id
+WHERE v.id > %(last_visit_id)s;
+"""
+
+# Wrap a TRANSFORM_*_SQL query to re-aggregate only the given partitions
+FILTER_TRANSFORM_BY_VISIT_MONTH_SQL = """
+SELECT *
+FROM ({transform_sql}) AS transformed
+WHERE TO_CHAR(transformed.visit_date, 'YYYY-MM') = ANY(%(partitions)s);
+"""
+
+FILTER_TRANSFORM_BY_FACILITY_TYPE_SQL = """
+SELECT *
+FROM ({transform_sql}) AS transformed
+WHERE REPLACE(transformed.facility_type, ' ', '_') = ANY(%(partitions)s);
+"""
@@ -1,12 +1,32 @@
-from typing import Optional
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from uuid import uuid4
 import psycopg2
 from psycopg2.extensions import connection
+from psycopg2.pool import ThreadedConnectionPool
 
 import pandas as pd
+import pyarrow as pa
 from pandas import DataFrame
 
 from data_dev.config import postgres_config
 
+# Arrow types of the PostgreSQL type OIDs reported in cursor.description, so a streamed result has the
+# same schema in every batch, whatever values (or NULLs) the first batch holds.
+# Other types are inferred from the values of the first batch.
+POSTGRES_ARROW_TYPES = {
+    16: pa.bool_(),
+    20: pa.int64(), 21: pa.int64(), 23: pa.int64(),
+    700: pa.float64(), 701: pa.float64(),
+    25: pa.string(), 1042: pa.string(), 1043: pa.string(),
+    1082: pa.date32(),
+    1114: pa.timestamp('us'), 1184: pa.timestamp('us', tz='UTC'),
+}
+NUMERIC_OID = 1700
+# Scale of numeric values without a declared scale (e.g. ROUND/SUM/AVG results); their actual scale
+# is only known once every row has been read.
+NUMERIC_DEFAULT_SCALE = 9
+
 
 class PostgresConnectorContextManager:
     """
@@ -80,12 +100,13 @@ class PostgresConnectorContextManager:
         """
         return self.connection
 
-    def get_data_sql(self, query: str) -> DataFrame:
+    def get_data_sql(self, query: str, params: Optional[dict] = None) -> DataFrame:
         """
         Execute a SQL query and return the results as a pandas DataFrame.
 
         Args:
             query (str): The SQL query to execute.
+            params (Optional[dict]): The parameters of the query, if any.
 
         Returns:
             DataFrame: A pandas DataFrame containing the query results.
@@ -94,8 +115,162 @@ class PostgresConnectorContextManager:
             Exception: If the query execution fails, an exception is raised with the error message.
         """
         try:
-            data_df = pd.read_sql(query, self.connection)
+            data_df = pd.read_sql(query, self.connection, params=params)
             return data_df
         except Exception as e:
             print(f'Failed to receive data from DB\nError: {e}\n')
             raise
+
+    @staticmethod
+    def arrow_type(column, column_values) -> pa.DataType:
+        """
+        Return the Arrow type of a result column from its PostgreSQL type.
+
+        numeric columns become decimal128(38, scale), with the declared scale or NUMERIC_DEFAULT_SCALE.
+        Columns of other types are inferred from the given values, all-null columns being typed as strings.
+
+        Args:
+            column (psycopg2.extensions.Column): The column, as reported in cursor.description.
+            column_values (list): Values of the column, used for types without a fixed mapping.
+
+        Returns:
+            pa.DataType: The Arrow type of the column.
+        """
+        if column.type_code in POSTGRES_ARROW_TYPES:
+            return POSTGRES_ARROW_TYPES[column.type_code]
+        if column.type_code == NUMERIC_OID:
+            return pa.decimal128(38, column.scale if column.scale is not None else NUMERIC_DEFAULT_SCALE)
+        inferred = pa.array(column_values).type
+        return pa.string() if pa.types.is_null(inferred) else inferred
+
+    @staticmethod
+    def to_record_batch(rows: list, description: list, schema: Optional[pa.Schema] = None) -> pa.RecordBatch:
+        """
+        Convert a list of row tuples into an Arrow record batch.
+
+        Without a schema, the schema is built from the column types in the cursor description (see `arrow_type`),
+        so that it can hold the following batches of the same query.
+
+        Args:
+            rows (list): The rows, as tuples, fetched from a cursor.
+            description (list): The cursor description of the columns.
+            schema (Optional[pa.Schema]): The schema to convert the rows to, if already known.
+
+        Returns:
+            pa.RecordBatch: The rows as a record batch.
+        """
+        values = list(zip(*rows)) if rows else [[] for _ in description]
+        if schema is None:
+            schema = pa.schema([
+                pa.field(column.name, PostgresConnectorContextManager.arrow_type(column, column_values))
+                for column, column_values in zip(description, values)
+            ])
+        return pa.RecordBatch.from_arrays(
+            [pa.array(column_values, type=field.type) for column_values, field in zip(values, schema)],
+            schema=schema
+        )
+
+    def stream_data_sql(self, query: str, params: Optional[dict] = None,
+                        batch_size: int = 50000) -> Iterator[pa.RecordBatch]:
+        """
+        Execute a SQL query through a server-side (named) cursor and yield the results as Arrow record batches.
+
+        Only one batch of rows is held in memory at a time. The schema is built from the column types
+        with the first batch and enforced on the following ones.
+
+        Args:
+            query (str): The SQL query to execute.
+            params (Optional[dict]): The parameters of the query, if any.
+            batch_size (int): The number of rows fetched from the server per batch.
+
+        Yields:
+            pa.RecordBatch: The next batch of the query results.
+
+        Raises:
+            Exception: If the query execution fails, an exception is raised with the error message.
+        """
+        try:
+            with self.connection.cursor(name=f'stream_{uuid4().hex}') as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(query, params)
+                schema = None
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    batch = self.to_record_batch(rows, cursor.description, schema)
+                    schema = batch.schema
+                    yield batch
+        except Exception as e:
+            print(f'Failed to stream data from DB\nError: {e}\n')
+            raise
+
+
+class PostgresConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool context manager.
+
+    Lets several threads query the database concurrently, each through its own connection
+    borrowed from the pool and wrapped in a PostgresConnectorContextManager.
+
+    Attributes:
+        maxconn (int): The maximum number of connections kept by the pool.
+        autocommit (bool): Whether to enable autocommit mode for the borrowed connections.
+        pool (Optional[ThreadedConnectionPool]): The active connection pool.
+    """
+
+    def __init__(self, maxconn: int, autocommit: bool = False):
+        """
+        Initialize the connection pool context manager.
+
+        Args:
+            maxconn (int): The maximum number of connections kept by the pool.
+            autocommit (bool): Enable or disable autocommit mode for the borrowed connections.
+                               Defaults to False.
+        """
+        self.maxconn = maxconn
+        self.autocommit = autocommit
+        self.pool: Optional[ThreadedConnectionPool] = None
+
+    def __enter__(self):
+        """
+        Enter the context manager and open the connection pool.
+
+        Returns:
+            PostgresConnectionPool: The context manager instance with an open pool.
+        """
+        self.pool = ThreadedConnectionPool(
+            minconn=1,
+            maxconn=self.maxconn,
+            host=postgres_config.host,
+            port=postgres_config.port,
+            database=postgres_config.db,
+            user=postgres_config.user,
+            password=postgres_config.password
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        """
+        Exit the context manager and close all connections of the pool.
+        """
+        if self.pool:
+            self.pool.closeall()
+
+    @contextmanager
+    def connector(self) -> Iterator[PostgresConnectorContextManager]:
+        """
+        Borrow a connection from the pool for the duration of a `with` block.
+
+        Yields:
+            PostgresConnectorContextManager: A connector bound to the borrowed connection. Any transaction
+            left open is rolled back when the connection is returned to the pool.
+        """
+        conn = self.pool.getconn()
+        conn.autocommit = self.autocommit
+        connector = PostgresConnectorContextManager(autocommit=self.autocommit)
+        connector.connection = conn
+        try:
+            yield connector
+        finally:
+            self.pool.putconn(conn)
@@ -1,9 +1,53 @@
 import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pyarrow as pa
 from faker import Faker
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from data_dev.config import data_generator_config
 
+# DataGenerator of the current worker process, created once by `_init_worker`
+_worker_generator = None
+
+
+def _init_worker(config):
+    """
+    Initializes a worker process of the parallel generation mode with its own DataGenerator.
+
+    Args:
+        config (DataGeneratorConfig): The configuration of the parent DataGenerator.
+    """
+    global _worker_generator
+    _worker_generator = DataGenerator(config=config)
+
+
+def _generate_patients_shard(id_range):
+    """
+    Generates the patients of one shard of the patient ID space in a worker process.
+
+    Args:
+        id_range (Tuple[int, int]): The first and the last patient ID of the shard.
+
+    Returns:
+        List[dict]: The patients of the shard.
+    """
+    return _worker_generator.generate_patients(*id_range)
+
+
+def _generate_visits_shard(date_range):
+    """
+    Generates the visits of one shard of the date range in a worker process.
+
+    Args:
+        date_range (Tuple[date, date]): The first and the last visit date of the shard.
+
+    Returns:
+        List[dict] or pyarrow.Table: The visits of the shard.
+    """
+    return _worker_generator.generate_visits_chunk(*date_range)
+
 
 class DataGenerator:
     """
@@ -17,31 +61,62 @@ class DataGenerator:
         date_format (str): The format of the date strings, sourced from generator_config.date_format.
         visits_per_day (Tuple[int, int]): The range (min, max) of visits per day, sourced from generator_config.visits_per_day.
         facility_types (List[str]): A list of facility types, sourced from generator_config.facility_types.
+        engine (str): The visit generation engine ('numpy' or 'python'), sourced from generator_config.engine.
+        seed (Optional[int]): The random seed, sourced from generator_config.seed.
+        chunk_months (Optional[int]): The number of months per chunk in streaming mode, sourced from
+                                      generator_config.chunk_months.
+        workers (int): The number of worker processes used for generation, sourced from generator_config.workers.
+        random (random.Random): The random number generator used by the 'python' engine.
+        rng (numpy.random.Generator): The random number generator used by the 'numpy' engine.
         patients (List[dict] or None): A list of generated patient data, initialized as None.
         facilities (List[dict] or None): A list of generated facility data, initialized as None.
-        visits (List[dict] or None): A list of generated visit data, initialized as None.
+        visits (List[dict] or pyarrow.Table or None): The generated visit data, initialized as None.
     """
 
-    def __init__(self):
+    # Patients are generated in blocks of fixed size, each with its own Faker seed, so that a
+    # seeded run produces the same patients whatever the number of workers.
+    PATIENT_BLOCK_SIZE = 1000
+
+    def __init__(self, config=None):
         """
         Initializes the DataGenerator class with configuration values and sets up Faker.
+
+        Args:
+            config (DataGeneratorConfig, optional): The configuration to use, defaults to data_generator_config.
         """
+        self.config = config or data_generator_config
         self.fake = Faker()
-        self.num_patients = data_generator_config.num_patients
-        self.start_date = data_generator_config.start_date
-        self.end_date = data_generator_config.end_date
-        self.date_format = data_generator_config.date_format
-        self.visits_per_day = data_generator_config.visits_per_day
-        self.facility_types = data_generator_config.facility_types
+        self.num_patients = self.config.num_patients
+        self.start_date = self.config.start_date
+        self.end_date = self.config.end_date
+        self.date_format = self.config.date_format
+        self.visits_per_day = self.config.visits_per_day
+        self.facility_types = self.config.facility_types
+        self.engine = self.config.engine
+        self.seed = self.config.seed
+        self.chunk_months = self.config.chunk_months
+        self.workers = self.config.workers
+
+        self.random = random.Random(self.seed)
+        self.rng = np.random.default_rng(self.seed)
+        if self.seed is not None:
+            self.fake.seed_instance(self.seed)
 
         self.patients = None
         self.facilities = None
         self.visits = None
 
-    def generate_patients(self):
+    def generate_patients(self, first_id=1, last_id=None):
         """
         Generates a list of synthetic patient data.
 
+        With a seed configured, every block of `PATIENT_BLOCK_SIZE` IDs re-seeds Faker from the seed and
+        the block number, so any ID range aligned to blocks is reproducible on its own.
+
+        Args:
+            first_id (int): The first patient ID to generate.
+            last_id (int, optional): The last patient ID to generate, defaults to `num_patients`.
+
         Returns:
             List[dict]: A list of dictionaries, each representing a patient with attributes:
                 - first_name (str): The first name of the patient.
@@ -49,10 +124,13 @@ class DataGenerator:
                 - date_of_birth (str): The date of birth of the patient in the configured date format.
                 - address (str): The address of the patient.
         """
+        last_id = last_id or self.num_patients
         patients = []
-        for i in range(0, self.num_patients):
+        for patient_id in range(first_id, last_id + 1):
+            if self.seed is not None and (patient_id - 1) % self.PATIENT_BLOCK_SIZE == 0:
+                self.fake.seed_instance(f"{self.seed}:patients:{(patient_id - 1) // self.PATIENT_BLOCK_SIZE}")
             patients.append({
-                "patient_id": i + 1,
+                "patient_id": patient_id,
                 "first_name": self.fake.first_name(),
                 "last_name": self.fake.last_name(),
                 "date_of_birth": self.fake.date_of_birth(minimum_age=18, maximum_age=100).strftime(self.date_format),
@@ -64,6 +142,9 @@ class DataGenerator:
         """
         Generates a list of synthetic facility data.
 
+        With a seed configured, Faker is re-seeded from the seed first, so the facilities do not depend on
+        how many patients were drawn before them in this process.
+
         Returns:
             List[dict]: A list of dictionaries, each representing a facility with attributes:
                 - facility_name (str): The name of the facility.
@@ -72,6 +153,8 @@ class DataGenerator:
                 - city (str): The city where the facility is located.
                 - state (str): The state where the facility is located.
         """
+        if self.seed is not None:
+            self.fake.seed_instance(f"{self.seed}:facilities")
         city = self.fake.city()
         state = self.fake.state()
         facilities = []
@@ -86,10 +169,15 @@ class DataGenerator:
             })
         return facilities
 
-    def generate_visits(self):
+    def generate_visits(self, start_date=None, end_date=None, rnd=None):
         """
         Generates a list of synthetic visit data.
 
+        Args:
+            start_date (date, optional): The first visit date, defaults to the configured start date.
+            end_date (date, optional): The last visit date, defaults to the configured end date.
+            rnd (random.Random, optional): The random number generator to draw from, defaults to `self.random`.
+
         Returns:
             List[dict]: A list of dictionaries, each representing a visit with attributes:
                 - patient_id (int): The ID of the patient (randomly assigned).
@@ -99,16 +187,17 @@ class DataGenerator:
                 - treatment_cost (float): The cost of the treatment (randomly generated).
                 - duration_minutes (int): The duration of the visit in minutes (randomly generated).
         """
+        start_date = start_date or datetime.strptime(self.start_date, self.date_format).date()
+        end_date = end_date or datetime.strptime(self.end_date, self.date_format).date()
+        rnd = rnd or self.random
         visits = []
-        date_list = [(datetime.strptime(self.end_date, self.date_format) - timedelta(days=i)) for i in
-                     range((datetime.strptime(self.end_date, self.date_format)
-                            - datetime.strptime(self.start_date, self.date_format)).days + 1)]
+        date_list = [end_date - timedelta(days=i) for i in range((end_date - start_date).days + 1)]
         for date in date_list:
-            num_visits_per_day = random.randint(self.visits_per_day[0], self.visits_per_day[1])
+            num_visits_per_day = rnd.randint(self.visits_per_day[0], self.visits_per_day[1])
             for _ in range(num_visits_per_day):
-                random_hour = random.randint(0, 23)
-                random_minute = random.randint(0, 59)
-                random_second = random.randint(0, 59)
+                random_hour = rnd.randint(0, 23)
+                random_minute = rnd.randint(0, 59)
+                random_second = rnd.randint(0, 59)
                 visit_timestamp = datetime(
                     year=date.year,
                     month=date.month,
@@ -118,28 +207,181 @@ class DataGenerator:
                     second=random_second
                 )
                 visits.append({
-                    "patient_id": random.randint(1, self.num_patients),
-                    "facility_id": random.randint(1, len(self.facility_types)),
+                    "patient_id": rnd.randint(1, self.num_patients),
+                    "facility_id": rnd.randint(1, len(self.facility_types)),
                     "visit_timestamp": visit_timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                    "treatment_cost": round(random.uniform(50, 5000), 2),
-                    "duration_minutes": random.randint(15, 60)
+                    "treatment_cost": round(rnd.uniform(50, 5000), 2),
+                    "duration_minutes": rnd.randint(15, 60)
                 })
         return visits
 
+    def generate_visits_table(self, start_date=None, end_date=None, rng=None):
+        """
+        Generates synthetic visit data in one vectorized pass.
+
+        Produces the same columns and value ranges as `generate_visits`, drawn from the seeded
+        numpy generator instead of one `random` call per value.
+
+        Args:
+            start_date (date, optional): The first visit date, defaults to the configured start date.
+            end_date (date, optional): The last visit date, defaults to the configured end date.
+            rng (numpy.random.Generator, optional): The generator to draw from, defaults to `self.rng`.
+
+        Returns:
+            pyarrow.Table: A table with the columns:
+                - patient_id (int32): The ID of the patient (randomly assigned).
+                - facility_id (int32): The ID of the facility (randomly assigned).
+                - visit_timestamp (timestamp[s]): The date and time of the visit.
+                - treatment_cost (float64): The cost of the treatment, rounded to 2 decimals.
+                - duration_minutes (int32): The duration of the visit in minutes.
+        """
+        start = np.datetime64(start_date or datetime.strptime(self.start_date, self.date_format).date(), 'D')
+        end = np.datetime64(end_date or datetime.strptime(self.end_date, self.date_format).date(), 'D')
+        rng = rng or self.rng
+        dates = end - np.arange((end - start).astype(int) + 1)
+        visits_per_date = rng.integers(self.visits_per_day[0], self.visits_per_day[1] + 1, size=len(dates))
+        num_visits = int(visits_per_date.sum())
+
+        visit_timestamp = (np.repeat(dates, visits_per_date).astype('datetime64[s]')
+                           + rng.integers(0, 24 * 60 * 60, size=num_visits).astype('timedelta64[s]'))
+        return pa.table({
+            "patient_id": rng.integers(1, self.num_patients + 1, size=num_visits, dtype=np.int32),
+            "facility_id": rng.integers(1, len(self.facility_types) + 1, size=num_visits, dtype=np.int32),
+            "visit_timestamp": visit_timestamp,
+            "treatment_cost": np.round(rng.uniform(50, 5000, size=num_visits), 2),
+            "duration_minutes": rng.integers(15, 61, size=num_visits, dtype=np.int32)
+        })
+
+    def iter_date_ranges(self):
+        """
+        Splits the configured date range into chunks of `chunk_months` calendar months.
+
+        Yields:
+            Tuple[date, date]: The first and the last date of each chunk, in ascending order.
+            The whole range is yielded as a single chunk when `chunk_months` is not set, unless
+            a seed is configured or the generation runs in parallel, in which case the range is sharded
+            by single months, each seeded on its own.
+        """
+        start_date = datetime.strptime(self.start_date, self.date_format).date()
+        end_date = datetime.strptime(self.end_date, self.date_format).date()
+        if not self.chunk_months and self.workers <= 1 and self.seed is None:
+            yield start_date, end_date
+            return
+        chunk_months = self.chunk_months or 1
+        chunk_start = start_date
+        while chunk_start <= end_date:
+            month_index = chunk_start.year * 12 + chunk_start.month - 1 + chunk_months
+            next_chunk_start = date(month_index // 12, month_index % 12 + 1, 1)
+            yield chunk_start, min(next_chunk_start - timedelta(days=1), end_date)
+            chunk_start = next_chunk_start
+
+    def generate_visits_chunk(self, start_date, end_date):
+        """
+        Generates the visits of a single date range with the configured engine.
+
+        With a seed configured, the chunk draws from its own generator, seeded from the seed and
+        the chunk start date, so a chunk is reproducible regardless of which chunks were generated before it.
+
+        Args:
+            start_date (date): The first visit date of the chunk.
+            end_date (date): The last visit date of the chunk.
+
+        Returns:
+            List[dict] or pyarrow.Table: The visits of the chunk.
+        """
+        if self.engine == 'numpy':
+            rng = np.random.default_rng([self.seed, start_date.toordinal()]) if self.seed is not None else None
+            return self.generate_visits_table(start_date=start_date, end_date=end_date, rng=rng)
+        if self.engine == 'python':
+            rnd = random.Random(f"{self.seed}:{start_date.isoformat()}") if self.seed is not None else None
+            return self.generate_visits(start_date=start_date, end_date=end_date, rnd=rnd)
+        raise ValueError(f"Unsupported generation engine: {self.engine}")
+
+    def iter_visit_chunks(self):
+        """
+        Lazily generates the visits chunk by chunk, so only one chunk is held in memory at a time.
+
+        With more than one worker, chunks are generated in a process pool and yielded in date order,
+        with at most two chunks per worker in flight. For a given seed and `chunk_months` the output
+        is identical to the serial mode.
+
+        Yields:
+            List[dict] or pyarrow.Table: The visits of each chunk of `chunk_months` months.
+        """
+        if self.workers <= 1:
+            for start_date, end_date in self.iter_date_ranges():
+                yield self.generate_visits_chunk(start_date, end_date)
+            return
+        with self.create_executor() as executor:
+            pending = deque()
+            for date_range in self.iter_date_ranges():
+                pending.append(executor.submit(_generate_visits_shard, date_range))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def create_executor(self):
+        """
+        Creates the process pool of the parallel generation mode.
+
+        Returns:
+            ProcessPoolExecutor: A pool of `workers` processes, each with its own DataGenerator.
+        """
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.config,))
+
+    def generate_reference_data(self):
+        """
+        Generates synthetic data for patients and facilities, and stores them in the class attributes.
+
+        With more than one worker, the patient ID space is split into blocks generated in a process pool.
+        """
+        if self.workers <= 1:
+            self.patients = self.generate_patients()
+        else:
+            id_ranges = [(first_id, min(first_id + self.PATIENT_BLOCK_SIZE - 1, self.num_patients))
+                         for first_id in range(1, self.num_patients + 1, self.PATIENT_BLOCK_SIZE)]
+            with self.create_executor() as executor:
+                self.patients = [patient for shard in executor.map(_generate_patients_shard, id_ranges)
+                                 for patient in shard]
+        self.facilities = self.generate_facilities()
+
+    def generate_visit_data(self):
+        """
+        Generates synthetic data for visits with the configured engine and stores it in the class attributes.
+
+        Visits are generated as a pyarrow.Table by the 'numpy' engine, or as a list of dictionaries
+        by the 'python' engine. With a seed or more than one worker, the visits are generated as per-month
+        seeded chunks (in parallel with more than one worker) and merged, so a seeded run gives the same
+        visits whatever the number of workers.
+        """
+        if self.workers > 1 or self.seed is not None:
+            chunks = list(self.iter_visit_chunks())
+            if self.engine == 'numpy':
+                self.visits = pa.concat_tables(chunks)
+            else:
+                self.visits = [visit for chunk in chunks for visit in chunk]
+        elif self.engine == 'numpy':
+            self.visits = self.generate_visits_table()
+        elif self.engine == 'python':
+            self.visits = self.generate_visits()
+        else:
+            raise ValueError(f"Unsupported generation engine: {self.engine}")
+
     def generate_data(self):
         """
         Generates synthetic data for patients, facilities, and visits, and stores them in the class attributes.
         """
-        self.patients = self.generate_patients()
-        self.facilities = self.generate_facilities()
-        self.visits = self.generate_visits()
+        self.generate_reference_data()
+        self.generate_visit_data()
 
     def get_visits(self):
         """
         Retrieves the generated visit data.
 
         Returns:
-            List[dict]: A list of visit data dictionaries.
+            List[dict] or pyarrow.Table: The visit data, as a list of dictionaries or a table
+            depending on the generation engine.
         """
         return self.visits
 
@@ -1,14 +1,85 @@
+import csv
+import io
+import logging
+import time
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from psycopg2.extras import execute_values
+
 from data_dev.src.data.data_generator import DataGenerator
+from data_dev.config import generated_data_loader_config
 from data_dev.queries import (
     CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY,
     CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY,
     CREATE_SRC_GENERATED_VISITS_TABLE_QUERY,
     INSERT_SRC_GENERATED_FACILITIES_QUERY,
     INSERT_SRC_GENERATED_PATIENTS_QUERY,
-    INSERT_SRC_GENERATED_VISITS_QUERY
+    INSERT_SRC_GENERATED_VISITS_QUERY,
+    COPY_SRC_GENERATED_FACILITIES_QUERY,
+    COPY_SRC_GENERATED_PATIENTS_QUERY,
+    COPY_SRC_GENERATED_VISITS_QUERY,
+    BATCH_INSERT_SRC_GENERATED_FACILITIES_QUERY,
+    BATCH_INSERT_SRC_GENERATED_PATIENTS_QUERY,
+    BATCH_INSERT_SRC_GENERATED_VISITS_QUERY,
+    SRC_GENERATED_FACILITIES_COLUMNS,
+    SRC_GENERATED_PATIENTS_COLUMNS,
+    SRC_GENERATED_VISITS_COLUMNS
 )
 
 
+class CsvRowStream:
+    """
+    A read-only file-like object that renders rows as CSV lazily, for use with COPY FROM STDIN.
+
+    psycopg2 pulls the data through `read(size)`, so only one buffer of CSV text is kept in memory
+    at a time, no matter how many rows are streamed.
+
+    Attributes:
+        rows (iterator): An iterator over the rows (dictionaries) to be streamed.
+        columns (tuple): The column names, in the order expected by the COPY statement.
+    """
+
+    def __init__(self, rows, columns):
+        """
+        Initializes the stream.
+
+        Args:
+            rows (iterable): The rows (dictionaries) to be streamed.
+            columns (tuple): The column names, in the order expected by the COPY statement.
+        """
+        self.rows = iter(rows)
+        self.columns = columns
+        self.rows_read = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._pending = ''
+
+    def read(self, size=-1):
+        """
+        Returns up to `size` characters of CSV text (everything left if `size` is negative).
+
+        Args:
+            size (int): The maximum number of characters to return.
+
+        Returns:
+            str: The next chunk of CSV text, or an empty string once all rows were read.
+        """
+        while size < 0 or len(self._pending) < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self._writer.writerow([row[column] for column in self.columns])
+            self.rows_read += 1
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate(0)
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
 class GeneratedDataLoader:
     """
     A class to handle the generation and loading of synthetic data into a database.
@@ -16,13 +87,42 @@ class GeneratedDataLoader:
     Attributes:
         conn (object): A database connection object.
         dg (DataGenerator): An instance of the DataGenerator class for generating synthetic data.
+        load_mode (str): The ingestion path ('copy', 'batch' or 'row'), sourced from generated_data_loader_config.
+        batch_size (int): The number of rows per statement in 'batch' mode, sourced from generated_data_loader_config.
 
     Methods:
         - is_table_empty(cursor, table_name): Checks if a given table is empty.
         - inject_data_into_table(cursor, data, query): Inserts data into a table using a specified query.
+        - batch_inject_data_into_table(cursor, data, query, columns, page_size): Inserts data with multi-row inserts.
+        - copy_data_into_table(cursor, data, query, columns): Streams data into a table through COPY FROM STDIN.
+        - load_table(cursor, table_name, data, log_throughput): Loads data into a src table using the configured
+          ingestion path.
+        - stream_visits(cursor): Generates and loads visits chunk by chunk.
         - inject_data(): Creates tables (if not exist) and injects generated data into the database.
     """
 
+    # table name -> (columns, per-row insert query, COPY query, multi-row insert query)
+    SRC_TABLES = {
+        'src_generated_facilities': (
+            SRC_GENERATED_FACILITIES_COLUMNS,
+            INSERT_SRC_GENERATED_FACILITIES_QUERY,
+            COPY_SRC_GENERATED_FACILITIES_QUERY,
+            BATCH_INSERT_SRC_GENERATED_FACILITIES_QUERY
+        ),
+        'src_generated_patients': (
+            SRC_GENERATED_PATIENTS_COLUMNS,
+            INSERT_SRC_GENERATED_PATIENTS_QUERY,
+            COPY_SRC_GENERATED_PATIENTS_QUERY,
+            BATCH_INSERT_SRC_GENERATED_PATIENTS_QUERY
+        ),
+        'src_generated_visits': (
+            SRC_GENERATED_VISITS_COLUMNS,
+            INSERT_SRC_GENERATED_VISITS_QUERY,
+            COPY_SRC_GENERATED_VISITS_QUERY,
+            BATCH_INSERT_SRC_GENERATED_VISITS_QUERY
+        )
+    }
+
     def __init__(self, conn):
         """
         Initializes the GeneratedDataLoader with a database connection.
@@ -32,6 +132,8 @@ class GeneratedDataLoader:
         """
         self.conn = conn
         self.dg = DataGenerator()
+        self.load_mode = generated_data_loader_config.load_mode
+        self.batch_size = generated_data_loader_config.batch_size
 
     @staticmethod
     def is_table_empty(cursor, table_name):
@@ -62,19 +164,130 @@ class GeneratedDataLoader:
         for params in data:
             cursor.execute(query, params)
 
+    @staticmethod
+    def batch_inject_data_into_table(cursor, data, query, columns, page_size):
+        """
+        Inserts data into a table with multi-row INSERT statements.
+
+        Args:
+            cursor (object): A database cursor object.
+            data (list): A list of data to be inserted.
+            query (str): The SQL query for inserting data, with a single `VALUES %s` placeholder.
+            columns (tuple): The column names, in the order used by the query.
+            page_size (int): The number of rows sent per statement.
+        """
+        template = '(' + ', '.join(f'%({column})s' for column in columns) + ')'
+        execute_values(cursor, query, data, template=template, page_size=page_size)
+
+    @staticmethod
+    def copy_data_into_table(cursor, data, query, columns):
+        """
+        Streams data into a table through COPY FROM STDIN in CSV format.
+
+        A pyarrow.Table is rendered to CSV by Arrow directly, without building per-row dictionaries.
+
+        Args:
+            cursor (object): A database cursor object.
+            data (list or pyarrow.Table): The data to be inserted.
+            query (str): The COPY ... FROM STDIN query.
+            columns (tuple): The column names, in the order used by the query.
+        """
+        if isinstance(data, pa.Table):
+            buffer = io.BytesIO()
+            pacsv.write_csv(data.select(list(columns)), buffer, pacsv.WriteOptions(include_header=False))
+            buffer.seek(0)
+            cursor.copy_expert(query, buffer)
+        else:
+            cursor.copy_expert(query, CsvRowStream(data, columns))
+
+    def load_table(self, cursor, table_name, data, log_throughput=True):
+        """
+        Loads data into a src table using the configured ingestion path and logs the throughput.
+
+        In 'copy' mode a failed COPY is rolled back to a savepoint and the rows are loaded
+        with batched multi-row inserts instead.
+
+        Args:
+            cursor (object): A database cursor object.
+            table_name (str): The name of the src table to load.
+            data (list or pyarrow.Table): The data to be inserted.
+            log_throughput (bool): Whether to log the rows/second of this load.
+
+        Returns:
+            int: The number of rows loaded.
+        """
+        columns, insert_query, copy_query, batch_insert_query = self.SRC_TABLES[table_name]
+        load_mode = self.load_mode
+        start = time.perf_counter()
+        if load_mode == 'copy':
+            cursor.execute('SAVEPOINT src_copy')
+            try:
+                self.copy_data_into_table(cursor=cursor, data=data, query=copy_query, columns=columns)
+                cursor.execute('RELEASE SAVEPOINT src_copy')
+            except Exception as e:
+                cursor.execute('ROLLBACK TO SAVEPOINT src_copy')
+                logging.warning(f"COPY into {table_name} failed, falling back to batched inserts: {e}")
+                load_mode = 'batch'
+        if load_mode != 'copy' and isinstance(data, pa.Table):
+            data = data.to_pylist()
+        if load_mode == 'batch':
+            self.batch_inject_data_into_table(
+                cursor=cursor,
+                data=data,
+                query=batch_insert_query,
+                columns=columns,
+                page_size=self.batch_size
+            )
+        elif load_mode == 'row':
+            self.inject_data_into_table(cursor=cursor, data=data, query=insert_query)
+        elif load_mode != 'copy':
+            raise ValueError(f"Unsupported load mode: {load_mode}")
+        elapsed = time.perf_counter() - start
+        rows = len(data)
+        if log_throughput:
+            logging.info(f"Loaded {rows} rows into {table_name} in {elapsed:.2f}s "
+                         f"({rows / elapsed if elapsed else 0:.0f} rows/s, mode: {load_mode})")
+        return rows
+
+    def stream_visits(self, cursor):
+        """
+        Generates visits chunk by chunk and loads each chunk as soon as it is produced,
+        so memory stays bounded by the size of one chunk.
+
+        Args:
+            cursor (object): A database cursor object.
+
+        Returns:
+            int: The total number of visits loaded.
+        """
+        start = time.perf_counter()
+        rows = 0
+        for chunk in self.dg.iter_visit_chunks():
+            rows += self.load_table(cursor=cursor, table_name='src_generated_visits', data=chunk,
+                                    log_throughput=False)
+        elapsed = time.perf_counter() - start
+        logging.info(f"Generated and loaded {rows} rows into src_generated_visits in {elapsed:.2f}s "
+                     f"({rows / elapsed if elapsed else 0:.0f} rows/s, {self.dg.chunk_months} month chunks)")
+        return rows
+
     def inject_data(self):
         """
         Creates tables (if they don't exist) and injects generated data into the database.
 
         This method:
-        1. Creates the `src_generated_facilities`, `src_generated_patients`, and 
+        1. Creates the `src_generated_facilities`, `src_generated_patients`, and
            `src_generated_visits` tables if they do not already exist.
         2. Checks if the `src_generated_visits` table is empty.
         3. If the table is empty, generates synthetic data for facilities, patients, and visits.
-        4. Inserts the generated data into the respective tables.
-        5. Commits the transaction if successful, or rolls back in case of an error.
+        4. Inserts the generated data into the respective tables using the configured load mode.
+           With `chunk_months` configured, visits are generated and inserted chunk by chunk.
+        5. Commits the transaction if successful, or rolls back and re-raises in case of an error.
+
+        Returns:
+            int: The number of rows loaded (0 if the src layer was already populated).
         """
         cursor = self.conn.cursor()
+        rows = 0
         try:
             # Create tables if they do not exist
             cursor.execute(CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY)
@@ -83,27 +296,24 @@ class GeneratedDataLoader:
 
             # Generate and insert data if the visits table is empty
             if self.is_table_empty(cursor=cursor, table_name='src_generated_visits'):
-                self.dg.generate_data()
-                self.inject_data_into_table(
-                    cursor=cursor,
-                    data=self.dg.get_facilities(),
-                    query=INSERT_SRC_GENERATED_FACILITIES_QUERY
-                )
-                self.inject_data_into_table(
-                    cursor=cursor,
-                    data=self.dg.get_patients(),
-                    query=INSERT_SRC_GENERATED_PATIENTS_QUERY
-                )
-                self.inject_data_into_table(
-                    cursor=cursor,
-                    data=self.dg.get_visits(),
-                    query=INSERT_SRC_GENERATED_VISITS_QUERY
-                )
+                self.dg.generate_reference_data()
+                rows += self.load_table(cursor=cursor, table_name='src_generated_facilities',
+                                        data=self.dg.get_facilities())
+                rows += self.load_table(cursor=cursor, table_name='src_generated_patients',
+                                        data=self.dg.get_patients())
+                if self.dg.chunk_months:
+                    rows += self.stream_visits(cursor=cursor)
+                else:
+                    self.dg.generate_visit_data()
+                    rows += self.load_table(cursor=cursor, table_name='src_generated_visits',
+                                            data=self.dg.get_visits())
                 self.conn.commit()
+            return rows
         except Exception as e:
             # Rollback the transaction in case of an error
             self.conn.rollback()
             print(f"Error occurred: {e}")
+            raise
         finally:
             # Close the cursor
             cursor.close()
@@ -1,9 +1,26 @@
+import logging
+from datetime import datetime
+
 from data_dev.queries import (CREATE_FACILITIES_TABLE_QUERY,
                               CREATE_PATIENTS_TABLE_QUERY,
                               CREATE_VISITS_TABLE_QUERY)
 from data_dev.queries import (MERGE_PATIENTS_QUERY,
                               MERGE_VISITS_QUERY,
                               MERGE_FACILITIES_QUERY)
+from data_dev.queries import (CREATE_LOAD_WATERMARKS_TABLE_QUERY,
+                              CREATE_FACILITIES_EXTERNAL_ID_INDEX_QUERY,
+                              CREATE_PATIENTS_EXTERNAL_ID_INDEX_QUERY,
+                              CREATE_VISITS_NATURAL_KEY_UNIQUE_INDEX_QUERY,
+                              CREATE_VISITS_NATURAL_KEY_INDEX_QUERY,
+                              CREATE_SRC_GENERATED_VISITS_TIMESTAMP_INDEX_QUERY,
+                              GET_WATERMARK_QUERY,
+                              UPSERT_WATERMARK_QUERY,
+                              GET_SRC_GENERATED_FACILITIES_HIGH_WATER_MARK_QUERY,
+                              GET_SRC_GENERATED_PATIENTS_HIGH_WATER_MARK_QUERY,
+                              GET_SRC_GENERATED_VISITS_HIGH_WATER_MARK_QUERY,
+                              MERGE_FACILITIES_INCREMENTAL_QUERY,
+                              MERGE_PATIENTS_INCREMENTAL_QUERY,
+                              MERGE_VISITS_INCREMENTAL_QUERY)
 from data_dev.config import load_config
 
 
@@ -15,10 +32,28 @@ class NF3Loader:
     1. Creating the necessary database tables if they do not already exist.
     2. Merging data into the 3NF tables using predefined SQL queries.
 
+    In 'incremental' load mode only the src rows above the high-water mark stored for each src table
+    in `load_watermarks` are merged, so a run costs O(new rows) instead of O(history).
+
     Attributes:
         conn: A psycopg2 database connection object used to interact with the database.
+        load_mode (str): 'full' or 'incremental', sourced from load_config.load_mode.
     """
 
+    # src table -> (high-water mark query, incremental merge query, parser of the stored watermark, lowest value)
+    INCREMENTAL_SOURCES = {
+        'src_generated_facilities': (
+            GET_SRC_GENERATED_FACILITIES_HIGH_WATER_MARK_QUERY, MERGE_FACILITIES_INCREMENTAL_QUERY, int, 0
+        ),
+        'src_generated_patients': (
+            GET_SRC_GENERATED_PATIENTS_HIGH_WATER_MARK_QUERY, MERGE_PATIENTS_INCREMENTAL_QUERY, int, 0
+        ),
+        'src_generated_visits': (
+            GET_SRC_GENERATED_VISITS_HIGH_WATER_MARK_QUERY, MERGE_VISITS_INCREMENTAL_QUERY,
+            datetime.fromisoformat, datetime.min
+        )
+    }
+
     def __init__(self, conn):
         """
         Initialize the NF3Loader with a database connection.
@@ -27,6 +62,63 @@ class NF3Loader:
             conn: A psycopg2 database connection object.
         """
         self.conn = conn
+        self.load_mode = load_config.load_mode
+
+    @staticmethod
+    def create_incremental_objects(cursor):
+        """
+        Create the watermark state table and the indexes used by the incremental merges.
+
+        The visits natural key index is created as UNIQUE; if existing rows already violate it,
+        a plain index is created instead and a warning is logged.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+        """
+        cursor.execute(CREATE_LOAD_WATERMARKS_TABLE_QUERY)
+        cursor.execute(CREATE_FACILITIES_EXTERNAL_ID_INDEX_QUERY)
+        cursor.execute(CREATE_PATIENTS_EXTERNAL_ID_INDEX_QUERY)
+        cursor.execute(CREATE_SRC_GENERATED_VISITS_TIMESTAMP_INDEX_QUERY)
+        cursor.execute('SAVEPOINT visits_natural_key_idx')
+        try:
+            cursor.execute(CREATE_VISITS_NATURAL_KEY_UNIQUE_INDEX_QUERY)
+            cursor.execute('RELEASE SAVEPOINT visits_natural_key_idx')
+        except Exception as e:
+            cursor.execute('ROLLBACK TO SAVEPOINT visits_natural_key_idx')
+            logging.warning(f"visits contains duplicated natural keys, creating a non-unique index instead: {e}")
+            cursor.execute(CREATE_VISITS_NATURAL_KEY_INDEX_QUERY)
+
+    def merge_incremental(self, cursor, source_table):
+        """
+        Merge the rows of a src table above its stored high-water mark and advance the watermark.
+
+        The new high-water mark is read before the merge, so rows arriving during the run are
+        left for the next one.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            source_table (str): The name of the src table to merge.
+
+        Returns:
+            int: The number of rows inserted into the 3NF table.
+        """
+        high_water_mark_query, merge_query, parse_watermark, lowest_value = self.INCREMENTAL_SOURCES[source_table]
+
+        cursor.execute(GET_WATERMARK_QUERY, {'source_table': source_table})
+        row = cursor.fetchone()
+        low_water_mark = parse_watermark(row[0]) if row else lowest_value
+
+        cursor.execute(high_water_mark_query, {'date_scope': load_config.date_scope})
+        high_water_mark = cursor.fetchone()[0]
+        if high_water_mark is None or high_water_mark <= low_water_mark:
+            logging.info(f"No new rows in {source_table} above watermark {low_water_mark}")
+            return 0
+
+        cursor.execute(merge_query, {'low_water_mark': low_water_mark, 'high_water_mark': high_water_mark})
+        merged_rows = cursor.rowcount
+        cursor.execute(UPSERT_WATERMARK_QUERY, {'source_table': source_table, 'high_water_mark': str(high_water_mark)})
+        logging.info(f"Merged {merged_rows} rows from {source_table} in ({low_water_mark}, {high_water_mark}]")
+        return merged_rows
 
     def load_data(self):
         """
@@ -34,15 +126,20 @@ class NF3Loader:
 
         This method performs the following steps:
         1. Creates the necessary tables (facilities, patients, visits) if they do not already exist.
-        2. Merges data into the 3NF tables using predefined SQL queries.
+        2. Merges data into the 3NF tables using predefined SQL queries, either over the whole src layer
+           ('full' load mode) or over the src rows above the stored watermarks ('incremental' load mode).
         3. Commits the transaction if all operations succeed.
-        4. Rolls back the transaction and prints the error if any operation fails.
+        4. Rolls back the transaction, prints the error and re-raises it if any operation fails.
+
+        Returns:
+            int: The number of rows inserted into the 3NF tables.
 
         Raises:
-            Exception: If any SQL execution fails, the exception is caught, the transaction is rolled back,
-                       and the error is printed.
+            Exception: If any SQL execution fails, the transaction is rolled back, the error is printed
+                       and the exception is re-raised.
         """
         cursor = self.conn.cursor()
+        rows = 0
         try:
             # Create tables if they do not exist
             cursor.execute(CREATE_FACILITIES_TABLE_QUERY)
@@ -50,16 +147,29 @@ class NF3Loader:
             cursor.execute(CREATE_VISITS_TABLE_QUERY)
 
             # Merge data into 3NF tables
-            cursor.execute(MERGE_FACILITIES_QUERY)
-            cursor.execute(MERGE_PATIENTS_QUERY)
-            cursor.execute(MERGE_VISITS_QUERY, {'date_scope': load_config.date_scope})
+            if self.load_mode == 'incremental':
+                self.create_incremental_objects(cursor)
+                rows += self.merge_incremental(cursor, 'src_generated_facilities')
+                rows += self.merge_incremental(cursor, 'src_generated_patients')
+                rows += self.merge_incremental(cursor, 'src_generated_visits')
+            elif self.load_mode == 'full':
+                cursor.execute(MERGE_FACILITIES_QUERY)
+                rows += cursor.rowcount
+                cursor.execute(MERGE_PATIENTS_QUERY)
+                rows += cursor.rowcount
+                cursor.execute(MERGE_VISITS_QUERY, {'date_scope': load_config.date_scope})
+                rows += cursor.rowcount
+            else:
+                raise ValueError(f"Unsupported load mode: {self.load_mode}")
 
             # Commit the transaction
             self.conn.commit()
+            return rows
         except Exception as e:
             # Rollback the transaction in case of an error
             self.conn.rollback()
             print(f"An error occurred during data loading: {e}")
+            raise
         finally:
             # Close the cursor
             cursor.close()
@@ -1,12 +1,61 @@
 import os
+import shutil
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from typing import Callable
+from urllib.parse import quote
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from psycopg2.extras import execute_values
 
 from data_dev.queries import (
     TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
     TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL,
     TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL
 )
-from data_dev.config import parquet_storage_config
+from data_dev.queries import (
+    CREATE_PARQUET_EXPORT_METADATA_TABLE_QUERY,
+    GET_LAST_EXPORTED_VISIT_ID_QUERY,
+    GET_MAX_VISIT_ID_QUERY,
+    UPSERT_PARQUET_EXPORT_METADATA_QUERY,
+    GET_CHANGED_VISIT_MONTHS_QUERY,
+    GET_CHANGED_FACILITY_TYPES_QUERY,
+    FILTER_TRANSFORM_BY_VISIT_MONTH_SQL,
+    FILTER_TRANSFORM_BY_FACILITY_TYPE_SQL
+)
+from data_dev.config import parquet_storage_config, parquet_export_config
+from data_dev.src.connectors.postgre_connector import PostgresConnectionPool
+
+
+@dataclass
+class ParquetDataset:
+    """
+    Description of a parquet dataset exported by LoadParquet.
+
+    Attributes:
+        name (str): The name of the dataset, used as key of its export metadata.
+        query (str): The TRANSFORM_*_SQL query producing the dataset.
+        storage_path (str): The file system path where the dataset is stored.
+        partition_column (str): The column the dataset is partitioned by.
+        prepare (Callable): Adds the partition column (and any type conversion) to the query result.
+        prepare_batch (Callable): The Arrow record batch counterpart of `prepare`, used in streaming mode.
+        changed_partitions_query (str): Returns the partitions touched by visits above a given visits.id.
+        partition_filter_query (str): Wraps `query` to re-aggregate only a given list of partitions.
+    """
+    name: str
+    query: str
+    storage_path: str
+    partition_column: str
+    prepare: Callable
+    prepare_batch: Callable
+    changed_partitions_query: str
+    partition_filter_query: str
 
 
 class LoadParquet:
@@ -23,19 +72,45 @@ class LoadParquet:
         Path to store the Parquet file for patient sum treatment cost per facility type.
     storage_path_facility_name_min_time_spent_per_visit_date : str
         Path to store the Parquet file for facility name minimum time spent per visit date.
+    incremental : bool
+        Whether only the partitions changed since the previous export are rewritten.
+    streaming : bool
+        Whether query results are streamed as Arrow record batches instead of loaded into DataFrames.
+    batch_size : int
+        Number of rows per record batch in streaming mode.
+    workers : int
+        Number of datasets exported concurrently.
+    datasets : dict
+        The exported datasets (ParquetDataset), by name.
 
     Methods:
     --------
-    read_data(query):
+    read_data(query, params):
         Executes the given SQL query and returns the result as a DataFrame.
     to_parquet(df, storage_path, partition_columns):
         Writes the given DataFrame to a Parquet file at the specified storage path, partitioned by the given columns.
+    to_parquet_stream(batches, storage_path, partition_column):
+        Writes a stream of Arrow record batches to a partitioned Parquet dataset, one batch at a time.
+    delete_partitions(storage_path, partition_column, partitions):
+        Deletes the directories of the given partitions of a Parquet dataset.
+    write_dataset(dataset, query, params):
+        Reads the result of a query and writes it to the Parquet files of a dataset.
+    get_changed_partitions(dataset):
+        Returns the partitions of a dataset changed since its previous export.
+    record_export_metadata(dataset, row_counts, partitions, max_visit_id):
+        Stores the per-partition metadata of an export.
+    export_dataset(dataset):
+        Transforms the data of a dataset and writes it (or its changed partitions) to Parquet files.
     transform_facility_type_avg_time_spent_per_visit_date():
         Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
     transform_patient_sum_treatment_cost_per_facility_type():
         Transforms data for patient sum treatment cost per facility type and writes it to a Parquet file.
     transform_facility_name_min_time_spent_per_visit_date():
         Transforms data for facility name minimum time spent per visit date and writes it to a Parquet file.
+    export_dataset_from_pool(pool, name):
+        Exports a dataset over a connection borrowed from a connection pool.
+    prepare_export():
+        Creates the export metadata table used by the incremental mode.
     load_parquet():
         Executes all transformations and loads the results into Parquet files.
     """
@@ -59,8 +134,44 @@ class LoadParquet:
         self.storage_path_facility_name_min_time_spent_per_visit_date = (
             parquet_storage_config.storage_path_facility_name_min_time_spent_per_visit_date
         )
+        self.incremental = parquet_export_config.incremental
+        self.streaming = parquet_export_config.streaming
+        self.batch_size = parquet_export_config.batch_size
+        self.workers = parquet_export_config.workers
+        self.datasets = {
+            'facility_type_avg_time_spent_per_visit_date': ParquetDataset(
+                name='facility_type_avg_time_spent_per_visit_date',
+                query=TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL,
+                storage_path=self.storage_path_facility_type_avg_time_spent_per_visit_date,
+                partition_column='partition_date',
+                prepare=self.add_partition_date,
+                prepare_batch=self.add_partition_date_batch,
+                changed_partitions_query=GET_CHANGED_VISIT_MONTHS_QUERY,
+                partition_filter_query=FILTER_TRANSFORM_BY_VISIT_MONTH_SQL
+            ),
+            'patient_sum_treatment_cost_per_facility_type': ParquetDataset(
+                name='patient_sum_treatment_cost_per_facility_type',
+                query=TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
+                storage_path=self.storage_path_patient_sum_treatment_cost_per_facility_type,
+                partition_column='facility_type_partition',
+                prepare=self.add_facility_type_partition,
+                prepare_batch=self.add_facility_type_partition_batch,
+                changed_partitions_query=GET_CHANGED_FACILITY_TYPES_QUERY,
+                partition_filter_query=FILTER_TRANSFORM_BY_FACILITY_TYPE_SQL
+            ),
+            'facility_name_min_time_spent_per_visit_date': ParquetDataset(
+                name='facility_name_min_time_spent_per_visit_date',
+                query=TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL,
+                storage_path=self.storage_path_facility_name_min_time_spent_per_visit_date,
+                partition_column='partition_date',
+                prepare=self.add_partition_date,
+                prepare_batch=self.add_partition_date_batch,
+                changed_partitions_query=GET_CHANGED_VISIT_MONTHS_QUERY,
+                partition_filter_query=FILTER_TRANSFORM_BY_VISIT_MONTH_SQL
+            )
+        }
 
-    def read_data(self, query):
+    def read_data(self, query, params=None):
         """
         Executes the given SQL query and returns the result as a DataFrame.
 
@@ -68,13 +179,15 @@ class LoadParquet:
         -----------
         query : str
             SQL query to execute.
+        params : dict, optional
+            Parameters of the SQL query.
 
         Returns:
         --------
         DataFrame
             Resulting data from the SQL query.
         """
-        df = self.connection_object.get_data_sql(query=query)
+        df = self.connection_object.get_data_sql(query=query, params=params)
         return df
 
     @staticmethod
@@ -82,6 +195,8 @@ class LoadParquet:
         """
         Writes the given DataFrame to a Parquet file at the specified storage path, partitioned by the given columns.
 
+        Only the partitions present in the DataFrame are replaced, the other partitions are left untouched.
+
         Parameters:
         -----------
         df : DataFrame
@@ -100,49 +215,322 @@ class LoadParquet:
             existing_data_behavior='delete_matching'
         )
 
-    def transform_facility_type_avg_time_spent_per_visit_date(self):
+    @staticmethod
+    def to_parquet_stream(batches, storage_path, partition_column):
         """
-        Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
+        Writes a stream of Arrow record batches to a Parquet dataset at the specified storage path,
+        partitioned by the given column, holding only one batch in memory at a time.
+
+        Only the partitions present in the stream are replaced, the other partitions are left untouched.
+
+        Parameters:
+        -----------
+        batches : iterator
+            Record batches to write; all batches share the schema of the first one.
+        storage_path : str
+            Path to store the Parquet dataset.
+        partition_column : str
+            Column to partition the Parquet dataset by.
+
+        Returns:
+        --------
+        dict
+            Number of rows written per partition value.
+        """
+        row_counts = {}
+
+        def count_rows(record_batches):
+            for batch in record_batches:
+                value_counts = pc.value_counts(batch.column(partition_column))
+                for value, count in zip(value_counts.field('values').to_pylist(),
+                                        value_counts.field('counts').to_pylist()):
+                    row_counts[value] = row_counts.get(value, 0) + count
+                yield batch
+
+        batches = iter(batches)
+        first_batch = next(batches, None)
+        if first_batch is None:
+            return row_counts
+        os.makedirs(storage_path, exist_ok=True)
+        ds.write_dataset(
+            count_rows(chain([first_batch], batches)),
+            storage_path,
+            schema=first_batch.schema,
+            format='parquet',
+            partitioning=[partition_column],
+            partitioning_flavor='hive',
+            existing_data_behavior='delete_matching'
+        )
+        return row_counts
+
+    @staticmethod
+    def delete_partitions(storage_path, partition_column, partitions):
+        """
+        Deletes the directories of the given partitions of a hive-partitioned Parquet dataset.
+
+        Rewritten partitions are deleted up front, so a partition that no longer has any rows
+        does not keep its stale files (the writers only replace the partitions they write).
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the Parquet dataset.
+        partition_column : str
+            Column the Parquet dataset is partitioned by.
+        partitions : list
+            Values of the partitions to delete.
+        """
+        for partition in partitions:
+            shutil.rmtree(os.path.join(storage_path, f"{partition_column}={quote(str(partition), safe='')}"),
+                          ignore_errors=True)
+
+    @staticmethod
+    def add_partition_date(df):
+        """
+        Converts `visit_date` to datetime and adds the monthly `partition_date` (YYYY-MM) column.
         """
-        df = self.read_data(TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL)
         df['visit_date'] = pd.to_datetime(df['visit_date'])
         df['partition_date'] = df['visit_date'].dt.to_period('M').astype(str)
-        self.to_parquet(
-            df=df,
-            storage_path=self.storage_path_facility_type_avg_time_spent_per_visit_date,
-            partition_columns=['partition_date']
-        )
+        return df
 
     # TODO: do better approach for: df['facility_type_partition'] = df['facility_type'] - workaround,
-    def transform_patient_sum_treatment_cost_per_facility_type(self):
+    @staticmethod
+    def add_facility_type_partition(df):
         """
-        Transforms data for patient sum treatment cost per facility type and writes it to a Parquet file.
+        Adds the `facility_type_partition` column (facility type with spaces replaced by underscores).
         """
-        df = self.read_data(TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL)
         df['facility_type_partition'] = df['facility_type'].str.replace(" ", "_")
-        self.to_parquet(
-            df=df,
-            storage_path=self.storage_path_patient_sum_treatment_cost_per_facility_type,
-            partition_columns=['facility_type_partition']
+        return df
+
+    @staticmethod
+    def add_partition_date_batch(batch):
+        """
+        Record batch counterpart of `add_partition_date`: casts `visit_date` to a timestamp and adds `partition_date`.
+        """
+        visit_date = pc.cast(batch.column('visit_date'), pa.timestamp('ns'))
+        batch = batch.set_column(batch.schema.get_field_index('visit_date'), 'visit_date', visit_date)
+        return batch.append_column('partition_date', pc.strftime(visit_date, format='%Y-%m'))
+
+    @staticmethod
+    def add_facility_type_partition_batch(batch):
+        """
+        Record batch counterpart of `add_facility_type_partition`: adds `facility_type_partition`.
+        """
+        return batch.append_column(
+            'facility_type_partition',
+            pc.replace_substring(batch.column('facility_type'), pattern=' ', replacement='_')
         )
 
+    def write_dataset(self, dataset, query, params=None):
+        """
+        Reads the result of a query and writes it to the Parquet files of a dataset,
+        either through a DataFrame or, in streaming mode, batch by batch.
+
+        Parameters:
+        -----------
+        dataset : ParquetDataset
+            The dataset to write.
+        query : str
+            SQL query producing the rows to write.
+        params : dict, optional
+            Parameters of the SQL query.
+
+        Returns:
+        --------
+        dict
+            Number of rows written per partition value.
+        """
+        if self.streaming:
+            batches = self.connection_object.stream_data_sql(query=query, params=params, batch_size=self.batch_size)
+            return self.to_parquet_stream(
+                batches=(dataset.prepare_batch(batch) for batch in batches),
+                storage_path=dataset.storage_path,
+                partition_column=dataset.partition_column
+            )
+        df = dataset.prepare(self.read_data(query, params))
+        if not df.empty:
+            self.to_parquet(df=df, storage_path=dataset.storage_path, partition_columns=[dataset.partition_column])
+        return df.groupby(dataset.partition_column).size().to_dict()
+
+    def get_changed_partitions(self, dataset):
+        """
+        Returns the partitions of a dataset touched by visits added since its previous export.
+
+        Parameters:
+        -----------
+        dataset : ParquetDataset
+            The dataset to check.
+
+        Returns:
+        --------
+        list or None
+            The sorted partition values to rewrite, or None if the dataset was never exported
+            (or its storage path is missing) and must be exported in full.
+        """
+        with self.connection_object.get_connection().cursor() as cursor:
+            cursor.execute(GET_LAST_EXPORTED_VISIT_ID_QUERY, {'dataset': dataset.name})
+            last_visit_id = cursor.fetchone()[0]
+            if last_visit_id is None or not os.path.isdir(dataset.storage_path):
+                return None
+            cursor.execute(dataset.changed_partitions_query, {'last_visit_id': last_visit_id})
+            return sorted(row[0] for row in cursor.fetchall())
+
+    def record_export_metadata(self, dataset, row_counts, partitions, max_visit_id):
+        """
+        Stores the row count, covered visits.id and export time of every exported partition.
+
+        Parameters:
+        -----------
+        dataset : ParquetDataset
+            The exported dataset.
+        row_counts : dict
+            Number of rows written per partition value.
+        partitions : list or None
+            The partitions that were rewritten, or None for a full export.
+        max_visit_id : int
+            The highest visits.id covered by the export.
+        """
+        row_counts = dict(row_counts)
+        for partition in partitions or []:
+            row_counts.setdefault(partition, 0)
+        if not row_counts:
+            return
+        connection = self.connection_object.get_connection()
+        with connection.cursor() as cursor:
+            execute_values(
+                cursor,
+                UPSERT_PARQUET_EXPORT_METADATA_QUERY,
+                [(dataset.name, str(partition), int(row_count), max_visit_id)
+                 for partition, row_count in row_counts.items()],
+                template='(%s, %s, %s, %s, NOW())'
+            )
+        connection.commit()
+
+    def export_dataset(self, dataset):
+        """
+        Transforms the data of a dataset and writes it to Parquet files.
+
+        In incremental mode only the partitions changed since the previous export are re-aggregated
+        and rewritten, and the per-partition export metadata is recorded. In streaming mode the rows
+        are written batch by batch, with bounded memory.
+
+        Parameters:
+        -----------
+        dataset : ParquetDataset
+            The dataset to export.
+
+        Returns:
+        --------
+        int
+            The number of rows written.
+        """
+        if not self.incremental:
+            return sum(self.write_dataset(dataset, dataset.query).values())
+
+        max_visit_id = self.connection_object.get_data_sql(GET_MAX_VISIT_ID_QUERY).iloc[0, 0]
+        partitions = self.get_changed_partitions(dataset)
+        if partitions is None:
+            row_counts = self.write_dataset(dataset, dataset.query)
+        elif partitions:
+            query = dataset.partition_filter_query.format(transform_sql=dataset.query.strip().rstrip(';'))
+            self.delete_partitions(dataset.storage_path, dataset.partition_column, partitions)
+            row_counts = self.write_dataset(dataset, query, params={'partitions': partitions})
+        else:
+            logging.info(f"No changed partitions in {dataset.name}, skipping export")
+            return 0
+
+        self.record_export_metadata(dataset=dataset, row_counts=row_counts, partitions=partitions,
+                                    max_visit_id=int(max_visit_id))
+        rows = sum(row_counts.values())
+        logging.info(f"Exported {rows} rows of {dataset.name} "
+                     f"({'all' if partitions is None else len(partitions)} partitions)")
+        return rows
+
+    def transform_facility_type_avg_time_spent_per_visit_date(self):
+        """
+        Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
+        """
+        return self.export_dataset(self.datasets['facility_type_avg_time_spent_per_visit_date'])
+
+    def transform_patient_sum_treatment_cost_per_facility_type(self):
+        """
+        Transforms data for patient sum treatment cost per facility type and writes it to a Parquet file.
+        """
+        return self.export_dataset(self.datasets['patient_sum_treatment_cost_per_facility_type'])
+
     def transform_facility_name_min_time_spent_per_visit_date(self):
         """
         Transforms data for facility name minimum time spent per visit date and writes it to a Parquet file.
         """
-        df = self.read_data(TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL)
-        df['visit_date'] = pd.to_datetime(df['visit_date'])
-        df['partition_date'] = df['visit_date'].dt.to_period('M').astype(str)
-        self.to_parquet(
-            df=df,
-            storage_path=self.storage_path_facility_name_min_time_spent_per_visit_date,
-            partition_columns=['partition_date']
-        )
+        return self.export_dataset(self.datasets['facility_name_min_time_spent_per_visit_date'])
+
+    @staticmethod
+    def export_dataset_from_pool(pool, name):
+        """
+        Exports a dataset over a connection borrowed from a connection pool.
+
+        Parameters:
+        -----------
+        pool : PostgresConnectionPool
+            The open connection pool.
+        name : str
+            The name of the dataset to export.
+
+        Returns:
+        --------
+        tuple
+            The number of rows written and the export time in seconds.
+        """
+        with pool.connector() as connector:
+            start = time.perf_counter()
+            loader = LoadParquet(connector)
+            rows = loader.export_dataset(loader.datasets[name])
+            return rows, time.perf_counter() - start
+
+    def prepare_export(self):
+        """
+        Creates the export metadata table if the datasets are exported incrementally.
+        """
+        if self.incremental:
+            connection = self.connection_object.get_connection()
+            with connection.cursor() as cursor:
+                cursor.execute(CREATE_PARQUET_EXPORT_METADATA_TABLE_QUERY)
+            connection.commit()
 
     def load_parquet(self):
         """
         Executes all transformations and loads the results into Parquet files.
+
+        With more than one worker, the transformations are independent read-only queries run concurrently,
+        each over its own connection from a pool, so the wall-clock time approaches the slowest transformation.
+
+        Returns:
+        --------
+        dict
+            The number of rows written and the export time in seconds, per dataset.
         """
-        self.transform_facility_type_avg_time_spent_per_visit_date()
-        self.transform_patient_sum_treatment_cost_per_facility_type()
-        self.transform_facility_name_min_time_spent_per_visit_date()
+        self.prepare_export()
+        start = time.perf_counter()
+        timings = {}
+        if self.workers > 1:
+            with PostgresConnectionPool(maxconn=self.workers) as pool, \
+                    ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {name: executor.submit(self.export_dataset_from_pool, pool, name) for name in self.datasets}
+                for name, future in futures.items():
+                    timings[name] = future.result()
+        else:
+            for name, transform in [
+                ('facility_type_avg_time_spent_per_visit_date',
+                 self.transform_facility_type_avg_time_spent_per_visit_date),
+                ('patient_sum_treatment_cost_per_facility_type',
+                 self.transform_patient_sum_treatment_cost_per_facility_type),
+                ('facility_name_min_time_spent_per_visit_date',
+                 self.transform_facility_name_min_time_spent_per_visit_date)
+            ]:
+                transform_start = time.perf_counter()
+                timings[name] = (transform(), time.perf_counter() - transform_start)
+
+        for name, (rows, elapsed) in timings.items():
+            logging.info(f"Parquet export of {name}: {rows} rows in {elapsed:.2f}s")
+        logging.info(f"Parquet export completed in {time.perf_counter() - start:.2f}s with {self.workers} worker(s)")
+        return timings
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+@dataclass
+class Stage:
+    """
+    A step of the pipeline.
+
+    Attributes:
+        name (str): The unique name of the stage.
+        func (Callable[[], Optional[int]]): The work of the stage; returns the number of rows processed, if known.
+        depends_on (List[str]): The names of the stages that must succeed before this stage starts.
+    """
+    name: str
+    func: Callable[[], Optional[int]]
+    depends_on: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StageResult:
+    """
+    The outcome of a stage in a pipeline run.
+
+    Attributes:
+        name (str): The name of the stage.
+        status (str): 'success', 'failed' or 'skipped' (a dependency did not succeed).
+        started_at (Optional[str]): The ISO timestamp the stage started at.
+        wall_time_s (Optional[float]): The wall time of the stage in seconds.
+        rows_processed (Optional[int]): The number of rows processed, as reported by the stage.
+        process_peak_rss_mb (Optional[float]): The peak resident set size of the whole process so far when the
+                                               stage finished, in MB. Stages share the process (and may run
+                                               concurrently), so this is a high-water mark of the run, not the
+                                               stage's own peak.
+        error (Optional[str]): The error message of a failed stage, or the reason a stage was skipped.
+    """
+    name: str
+    status: str
+    started_at: Optional[str] = None
+    wall_time_s: Optional[float] = None
+    rows_processed: Optional[int] = None
+    process_peak_rss_mb: Optional[float] = None
+    error: Optional[str] = None
+
+
+class PipelineScheduler:
+    """
+    Runs pipeline stages in dependency order.
+
+    Stages whose dependencies have all succeeded run concurrently in a thread pool; the dependents of
+    a failed stage are skipped instead of running on stale data. Every run produces a StageResult per stage.
+
+    Attributes:
+        stages (Dict[str, Stage]): The stages of the pipeline, by name.
+        max_workers (int): The maximum number of stages running at the same time.
+    """
+
+    def __init__(self, stages: List[Stage], max_workers: int = 4):
+        """
+        Initializes the scheduler and validates the dependency graph.
+
+        Args:
+            stages (List[Stage]): The stages of the pipeline.
+            max_workers (int): The maximum number of stages running at the same time.
+
+        Raises:
+            ValueError: If a stage name is duplicated, a dependency is unknown, or the dependencies form a cycle.
+        """
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicated stage: {stage.name}")
+            self.stages[stage.name] = stage
+        for stage in stages:
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dependency}")
+        self.check_acyclic()
+        self.max_workers = max_workers
+
+    def check_acyclic(self):
+        """
+        Checks that the dependencies between stages do not form a cycle.
+
+        Raises:
+            ValueError: If the dependencies form a cycle.
+        """
+        visited, in_progress = set(), set()
+
+        def visit(name):
+            if name in in_progress:
+                raise ValueError(f"Dependency cycle through stage {name}")
+            if name not in visited:
+                in_progress.add(name)
+                for dependency in self.stages[name].depends_on:
+                    visit(dependency)
+                in_progress.remove(name)
+                visited.add(name)
+
+        for stage_name in self.stages:
+            visit(stage_name)
+
+    @staticmethod
+    def process_peak_rss_mb() -> Optional[float]:
+        """
+        Returns the peak resident set size of the current process in MB, or None where it is not available.
+        """
+        if resource is None:
+            return None
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    def run_stage(self, stage: Stage) -> StageResult:
+        """
+        Runs a single stage and measures it.
+
+        Args:
+            stage (Stage): The stage to run.
+
+        Returns:
+            StageResult: The outcome of the stage.
+        """
+        logging.info(f"Stage {stage.name} started")
+        started_at = datetime.now().isoformat(timespec='seconds')
+        start = time.perf_counter()
+        try:
+            rows = stage.func()
+            status, error = 'success', None
+            logging.info(f"Stage {stage.name} completed")
+        except Exception as e:
+            rows, status, error = None, 'failed', f"{type(e).__name__}: {e}"
+            logging.exception(f"Stage {stage.name} FAILED: {e}")
+        return StageResult(
+            name=stage.name,
+            status=status,
+            started_at=started_at,
+            wall_time_s=round(time.perf_counter() - start, 3),
+            rows_processed=rows,
+            process_peak_rss_mb=self.process_peak_rss_mb(),
+            error=error
+        )
+
+    def run(self) -> List[StageResult]:
+        """
+        Runs all stages, each as soon as all its dependencies have succeeded.
+
+        Returns:
+            List[StageResult]: The outcome of every stage, in the order the stages were declared.
+        """
+        results: Dict[str, StageResult] = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while len(results) < len(self.stages):
+                for stage in self.stages.values():
+                    if stage.name in results or stage.name in running.values():
+                        continue
+                    failed = [d for d in stage.depends_on if d in results and results[d].status != 'success']
+                    if failed:
+                        results[stage.name] = StageResult(name=stage.name, status='skipped',
+                                                          error=f"Dependency did not succeed: {', '.join(failed)}")
+                        logging.warning(f"Stage {stage.name} skipped: {', '.join(failed)} did not succeed")
+                    elif all(d in results for d in stage.depends_on):
+                        running[executor.submit(self.run_stage, stage)] = stage.name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        return [results[name] for name in self.stages]
+
+    @staticmethod
+    def write_report(results: List[StageResult], path: str, wall_time_s: float):
+        """
+        Writes the structured timing report of a run to a JSON file.
+
+        Args:
+            results (List[StageResult]): The outcome of every stage.
+            path (str): The path of the JSON file.
+            wall_time_s (float): The wall time of the whole run in seconds.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as report_file:
+            json.dump({
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+                'wall_time_s': round(wall_time_s, 3),
+                'succeeded': all(result.status == 'success' for result in results),
+                'stages': [asdict(result) for result in results]
+            }, report_file, indent=2)
+
+    @staticmethod
+    def log_report(results: List[StageResult]):
+        """
+        Logs the timing report of a run, one line per stage.
+
+        Args:
+            results (List[StageResult]): The outcome of every stage.
+        """
+        for result in results:
+            peak_rss = result.process_peak_rss_mb if result.process_peak_rss_mb is not None else '-'
+            logging.info(f"{result.name:<50} {result.status:<8} "
+                         f"wall={result.wall_time_s if result.wall_time_s is not None else '-'}s "
+                         f"rows={result.rows_processed if result.rows_processed is not None else '-'} "
+                         f"process_peak_rss={peak_rss}MB")
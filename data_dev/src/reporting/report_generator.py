@@ -148,9 +148,13 @@ class ReportGenerator:
         - Creates a table and doughnut chart elements.
         - Updates the layout of the figure.
         - Writes the figure to an HTML file.
+
+        Returns:
+            int: The number of rows shown in the report table.
         """
         last_week_data = self.transform_data()
         self.create_table_element(last_week_data)
         self.create_doughnut_element(last_week_data)
         self.update_layout()
         self.write_html()
+        return len(last_week_data)
@@ -0,0 +1,38 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from data_dev.config import DataGeneratorConfig
+from data_dev.src.data.data_generator import DataGenerator
+
+
+def generate(workers, engine='numpy', chunk_months=None):
+    generator = DataGenerator(config=DataGeneratorConfig(
+        num_patients=1500,
+        start_date='2020-01-15',
+        end_date='2020-04-10',
+        date_format='%Y-%m-%d',
+        facility_types=['Hospital', 'Clinic', 'Urgent Care'],
+        visits_per_day=(1, 5),
+        engine=engine,
+        seed=42,
+        chunk_months=chunk_months,
+        workers=workers
+    ))
+    generator.generate_data()
+    return generator
+
+
+def visits_frame(visits):
+    return visits.to_pandas() if isinstance(visits, pa.Table) else pd.DataFrame(visits)
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'python'])
+@pytest.mark.parametrize('chunk_months', [None, 2])
+def test_parallel_generation_matches_serial(engine, chunk_months):
+    serial = generate(workers=1, engine=engine, chunk_months=chunk_months)
+    parallel = generate(workers=2, engine=engine, chunk_months=chunk_months)
+
+    assert parallel.get_patients() == serial.get_patients()
+    assert parallel.get_facilities() == serial.get_facilities()
+    pd.testing.assert_frame_equal(visits_frame(parallel.get_visits()), visits_frame(serial.get_visits()))
@@ -0,0 +1,14 @@
+import os
+
+import pandas as pd
+
+from data_dev.src.data.parquet_loader import LoadParquet
+
+
+def test_delete_partitions_removes_only_given_partitions(tmp_path):
+    df = pd.DataFrame({'value': [1, 2, 3], 'partition': ['2020-01', '2020-02', 'Urgent Care']})
+    LoadParquet.to_parquet(df=df, storage_path=str(tmp_path), partition_columns=['partition'])
+
+    LoadParquet.delete_partitions(str(tmp_path), 'partition', ['2020-01', 'Urgent Care', '2099-01'])
+
+    assert os.listdir(tmp_path) == ['partition=2020-02']
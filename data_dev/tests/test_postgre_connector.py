@@ -0,0 +1,30 @@
+from datetime import date
+from decimal import Decimal
+
+import pyarrow as pa
+from psycopg2.extensions import Column
+
+from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+
+DESCRIPTION = [
+    Column('facility_type', 25, None, None, None, None, None),
+    Column('visit_date', 1082, None, None, None, None, None),
+    Column('min_time_spent', 23, None, None, None, None, None),
+    Column('sum_treatment_cost', 1700, None, None, None, None, None),
+]
+
+
+def test_schema_comes_from_column_types_not_first_batch():
+    first = PostgresConnectorContextManager.to_record_batch([(None, None, None, None)], DESCRIPTION)
+    second = PostgresConnectorContextManager.to_record_batch(
+        [('Clinic', date(2024, 1, 2), 15, Decimal('-1234.5678'))], DESCRIPTION, first.schema
+    )
+
+    assert first.schema == pa.schema([
+        ('facility_type', pa.string()),
+        ('visit_date', pa.date32()),
+        ('min_time_spent', pa.int64()),
+        ('sum_treatment_cost', pa.decimal128(38, 9)),
+    ])
+    assert second.to_pylist() == [{'facility_type': 'Clinic', 'visit_date': date(2024, 1, 2), 'min_time_spent': 15,
+                                   'sum_treatment_cost': Decimal('-1234.567800000')}]